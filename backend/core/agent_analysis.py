@@ -0,0 +1,649 @@
+"""
+Generate, export and analyze example agent populations, and compare them with
+the population summary.
+
+Shared by the demographic report script and the agent export tests.
+"""
+from typing import Dict, List, Any, Optional, Union, Iterable
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# pyarrow is optional; it only speeds up writing plain CSV exports
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+from backend.core.agent_generator import (
+    generate_agent_characteristics,
+    DeterministicRandom,
+    CompiledDemographic,
+    compile_demographic,
+    compile_distribution,
+    CATEGORY_TABLES
+)
+from backend.core.population_summary import summarize_population
+from backend.core.schemas import (
+    DemographicDistribution,
+    NumericalCharacteristicsDistribution,
+    CategoricalCharacteristicsDistribution,
+    DistributionData,
+    PoliticalAffiliationDistribution,
+    ProbabilityPoint,
+    CategoricalProbabilityWithEnum,
+    AgentCharacteristics
+)
+
+NUMERICAL_COLUMNS = [
+    "age",
+    "income_level",
+    "years_of_education",
+    "religiosity",
+    "political_economic",
+    "political_governance",
+    "political_cultural"
+]
+
+# (column name, attrgetter) pairs for reading agent fields; attrgetter walks the chain in C
+NUMERICAL_GETTERS = (
+    ("age", attrgetter("numerical.age")),
+    ("income_level", attrgetter("numerical.income_level")),
+    ("years_of_education", attrgetter("numerical.years_of_education")),
+    ("religiosity", attrgetter("numerical.religiosity")),
+    ("political_economic", attrgetter("numerical.political_affiliation.economic")),
+    ("political_governance", attrgetter("numerical.political_affiliation.governance")),
+    ("political_cultural", attrgetter("numerical.political_affiliation.cultural"))
+)
+CATEGORICAL_GETTERS = tuple((name, attrgetter(f"categorical.{name}")) for name in CATEGORY_TABLES)
+
+# Characteristic keys in display order, with getters that fetch each group in one call
+NUMERICAL_KEYS = ("age", "income_level", "years_of_education", "religiosity")
+POLITICAL_KEYS = ("economic", "governance", "cultural")
+CATEGORICAL_KEYS = ("race_ethnicity", "gender", "religion", "urbanization", "education_style", "employment_style", "location")
+NUMERICAL_KEYS_GETTER = attrgetter(*NUMERICAL_KEYS)
+POLITICAL_KEYS_GETTER = attrgetter(*POLITICAL_KEYS)
+CATEGORICAL_KEYS_GETTER = attrgetter(*CATEGORICAL_KEYS)
+
+# Every possible value of each categorical, in enum order
+CATEGORICAL_DOMAINS = {name: table.tolist() for name, table in CATEGORY_TABLES.items()}
+
+# Populations larger than this are generated across processes by default
+PARALLEL_THRESHOLD = 2000
+
+# Rows per block handed to the CSV writer; bounds memory for very large populations
+CSV_CHUNK_SIZE = 100_000
+
+@lru_cache(maxsize=1)
+def create_example_demographic() -> DemographicDistribution:
+    """
+    Create an example demographic distribution.
+    
+    Built once and shared; callers must not mutate the returned distribution.
+    
+    Returns:
+        The example demographic distribution
+    """
+    # Create example probability points for age distribution
+    age_points = [
+        ProbabilityPoint(value=20, probability=0.2),
+        ProbabilityPoint(value=30, probability=0.3),
+        ProbabilityPoint(value=40, probability=0.3),
+        ProbabilityPoint(value=60, probability=0.2)
+    ]
+    
+    # Create example probability points for income distribution
+    income_points = [
+        ProbabilityPoint(value=30000, probability=0.3),
+        ProbabilityPoint(value=60000, probability=0.4),
+        ProbabilityPoint(value=100000, probability=0.2),
+        ProbabilityPoint(value=150000, probability=0.1)
+    ]
+    
+    # Create example probability points for education distribution
+    education_points = [
+        ProbabilityPoint(value=12, probability=0.4),
+        ProbabilityPoint(value=16, probability=0.4),
+        ProbabilityPoint(value=20, probability=0.2)
+    ]
+    
+    # Create example probability points for religiosity distribution
+    religiosity_points = [
+        ProbabilityPoint(value=2, probability=0.3),
+        ProbabilityPoint(value=5, probability=0.4),
+        ProbabilityPoint(value=8, probability=0.3)
+    ]
+    
+    # Create example political distributions
+    economic_points = [
+        ProbabilityPoint(value=-0.5, probability=0.3),
+        ProbabilityPoint(value=0, probability=0.4),
+        ProbabilityPoint(value=0.5, probability=0.3)
+    ]
+    
+    governance_points = [
+        ProbabilityPoint(value=-0.7, probability=0.2),
+        ProbabilityPoint(value=-0.2, probability=0.3),
+        ProbabilityPoint(value=0.3, probability=0.3),
+        ProbabilityPoint(value=0.8, probability=0.2)
+    ]
+    
+    cultural_points = [
+        ProbabilityPoint(value=-0.8, probability=0.25),
+        ProbabilityPoint(value=-0.3, probability=0.25),
+        ProbabilityPoint(value=0.3, probability=0.25),
+        ProbabilityPoint(value=0.8, probability=0.25)
+    ]
+    
+    # Create example categorical distributions
+    race_ethnicity = [
+        CategoricalProbabilityWithEnum(category="white", probability=0.6),
+        CategoricalProbabilityWithEnum(category="black", probability=0.15),
+        CategoricalProbabilityWithEnum(category="hispanic", probability=0.15),
+        CategoricalProbabilityWithEnum(category="east asian", probability=0.1)
+    ]
+    
+    gender = [
+        CategoricalProbabilityWithEnum(category="male", probability=0.48),
+        CategoricalProbabilityWithEnum(category="female", probability=0.48),
+        CategoricalProbabilityWithEnum(category="nonbinary", probability=0.04)
+    ]
+    
+    religion = [
+        CategoricalProbabilityWithEnum(category="christian", probability=0.65),
+        CategoricalProbabilityWithEnum(category="jewish", probability=0.05),
+        CategoricalProbabilityWithEnum(category="muslim", probability=0.05),
+        CategoricalProbabilityWithEnum(category="hindu", probability=0.05),
+        CategoricalProbabilityWithEnum(category="buddhist", probability=0.05),
+        CategoricalProbabilityWithEnum(category="other", probability=0.15)
+    ]
+    
+    urbanization = [
+        CategoricalProbabilityWithEnum(category="urban", probability=0.4),
+        CategoricalProbabilityWithEnum(category="suburban", probability=0.4),
+        CategoricalProbabilityWithEnum(category="rural", probability=0.2)
+    ]
+    
+    education_style = [
+        CategoricalProbabilityWithEnum(category="formal k-12", probability=0.3),
+        CategoricalProbabilityWithEnum(category="formal k-12 + university", probability=0.5),
+        CategoricalProbabilityWithEnum(category="vocational", probability=0.2)
+    ]
+    
+    employment_style = [
+        CategoricalProbabilityWithEnum(category="white-collar", probability=0.4),
+        CategoricalProbabilityWithEnum(category="blue-collar", probability=0.3),
+        CategoricalProbabilityWithEnum(category="entrepreneur", probability=0.1),
+        CategoricalProbabilityWithEnum(category="unemployed", probability=0.1),
+        CategoricalProbabilityWithEnum(category="retired", probability=0.1)
+    ]
+    
+    # Create the full demographic distribution
+    return DemographicDistribution(
+        numerical=NumericalCharacteristicsDistribution(
+            age=DistributionData(range=[18, 80], points=age_points),
+            income_level=DistributionData(range=[20000, 200000], points=income_points),
+            years_of_education=DistributionData(range=[8, 22], points=education_points),
+            religiosity=DistributionData(range=[0, 10], points=religiosity_points),
+            political_affiliation=PoliticalAffiliationDistribution(
+                economic=DistributionData(range=[-1, 1], points=economic_points),
+                governance=DistributionData(range=[-1, 1], points=governance_points),
+                cultural=DistributionData(range=[-1, 1], points=cultural_points)
+            )
+        ),
+        categorical=CategoricalCharacteristicsDistribution(
+            race_ethnicity=race_ethnicity,
+            gender=gender,
+            religion=religion,
+            urbanization=urbanization,
+            education_style=education_style,
+            employment_style=employment_style,
+            location="New York"
+        )
+    )
+
+def format_agent_characteristics(agent_characteristics: AgentCharacteristics) -> Dict[str, Dict[str, Any]]:
+    """
+    Format agent characteristics for display.
+    
+    Args:
+        agent_characteristics: The agent's characteristics, as a Pydantic model
+            or the named tuples generated with fast=True
+    
+    Returns:
+        A dictionary with "numerical" and "categorical" values in display order,
+        with the income level formatted as dollars
+    """
+    numerical = agent_characteristics.numerical
+    categorical = agent_characteristics.categorical
+    
+    # Format numerical characteristics
+    formatted_numerical = dict(zip(NUMERICAL_KEYS, NUMERICAL_KEYS_GETTER(numerical)))
+    formatted_numerical["income_level"] = f"${numerical.income_level:,.0f}"
+    formatted_numerical["political_affiliation"] = dict(
+        zip(POLITICAL_KEYS, POLITICAL_KEYS_GETTER(numerical.political_affiliation))
+    )
+    
+    # Format categorical characteristics
+    formatted_categorical = dict(zip(CATEGORICAL_KEYS, CATEGORICAL_KEYS_GETTER(categorical)))
+    
+    return {
+        "numerical": formatted_numerical,
+        "categorical": formatted_categorical
+    }
+
+def generate_agent_chunk(
+    demographic: Union[DemographicDistribution, CompiledDemographic],
+    start: int,
+    size: int,
+    seed: str = "test_seed"
+) -> List[AgentCharacteristics]:
+    """
+    Generate agents start..start+size-1 with their per-agent deterministic seeds.
+    
+    Agent i is seeded with f"{seed}_{i}", so a chunk produces the same agents no
+    matter which process generates it. Agents are only read attribute by
+    attribute, so they are built as named tuples without Pydantic validation.
+    
+    Args:
+        demographic: The demographic distribution to sample from, optionally
+            precompiled with compile_demographic
+        start: The index of the first agent
+        size: The number of agents to generate
+        seed: The prefix of the per-agent seeds
+    
+    Returns:
+        The generated agents
+    """
+    return [
+        generate_agent_characteristics(demographic, DeterministicRandom(f"{seed}_{i}"), fast=True)
+        for i in range(start, start + size)
+    ]
+
+def generate_seeded_agents(
+    demographic: Union[DemographicDistribution, CompiledDemographic],
+    num_agents: int = 500,
+    workers: Optional[int] = None,
+    seed: str = "test_seed"
+) -> List[AgentCharacteristics]:
+    """
+    Generate a list of agents based on the demographic distribution.
+    
+    Agents are independent, so large populations (or an explicit worker count)
+    are split into contiguous chunks generated in separate processes. The
+    result is identical to the serial path.
+    
+    Args:
+        demographic: The demographic distribution to sample from, optionally
+            precompiled with compile_demographic
+        num_agents: The number of agents to generate
+        workers: The number of processes to use; defaults to serial generation
+            up to PARALLEL_THRESHOLD agents and one process per CPU beyond it
+        seed: The prefix of the per-agent seeds
+    
+    Returns:
+        The generated agents
+    """
+    # Build the sampling tables once rather than from the distributions for every agent
+    if not isinstance(demographic, CompiledDemographic):
+        demographic = compile_demographic(demographic)
+    
+    if workers is None and num_agents <= PARALLEL_THRESHOLD:
+        return generate_agent_chunk(demographic, 0, num_agents, seed)
+    
+    workers = workers or os.cpu_count() or 1
+    chunk_size = -(-num_agents // workers)
+    starts = range(0, num_agents, chunk_size)
+    sizes = [min(chunk_size, num_agents - start) for start in starts]
+    
+    agents = []
+    with ProcessPoolExecutor(workers) as executor:
+        for chunk in executor.map(generate_agent_chunk, [demographic] * len(sizes), starts, sizes, [seed] * len(sizes)):
+            agents.extend(chunk)
+    
+    return agents
+
+def agents_to_batch(agents: List[AgentCharacteristics]) -> Dict[str, np.ndarray]:
+    """
+    Materialize a list of agents as a generate_agents_batch structure of arrays.
+    
+    Numerical and code columns are preallocated at their final length and
+    filled in one pass, so no intermediate Python lists are built for them.
+    
+    Args:
+        agents: The agents to convert
+    
+    Returns:
+        A dictionary mapping column names to arrays, as generate_agents_batch returns
+    """
+    num_agents = len(agents)
+    cols = {
+        name: np.fromiter((get(a) for a in agents), dtype=np.float64, count=num_agents)
+        for name, get in NUMERICAL_GETTERS
+    }
+    
+    for name, get in CATEGORICAL_GETTERS:
+        codes = {value: code for code, value in enumerate(CATEGORY_TABLES[name])}
+        cols[f"{name}_code"] = np.fromiter(
+            (codes[get(a)] for a in agents), dtype=np.int8, count=num_agents
+        )
+    
+    cols["location"] = np.array([a.categorical.location for a in agents])
+    return cols
+
+def batch_to_columns(cols: Dict[str, np.ndarray], encode_categoricals: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Turn a generate_agents_batch structure of arrays into CSV columns.
+    
+    Args:
+        cols: The batch columns
+        encode_categoricals: Keep the categorical int8 codes instead of decoding
+            them to their strings
+    
+    Returns:
+        A dictionary mapping CSV column names to arrays
+    """
+    columns = {name: cols[name] for name in NUMERICAL_COLUMNS}
+    for name, table in CATEGORY_TABLES.items():
+        codes = cols[f"{name}_code"]
+        columns[name] = codes if encode_categoricals else table[codes]
+    columns["location"] = cols["location"]
+    return columns
+
+def save_agents_to_csv(
+    agents: Union[Dict[str, np.ndarray], List[AgentCharacteristics]],
+    csv_path: Union[str, os.PathLike],
+    *,
+    encode_categoricals: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Save generated agents to a CSV file.
+    
+    With encode_categoricals the categorical columns are written as int8 codes,
+    numbers are written to six significant digits, and the code tables are
+    saved next to the CSV as "<csv_path>.legend.json". Uses pyarrow's
+    multi-threaded CSV writer when it is installed and pandas otherwise.
+    
+    Args:
+        agents: The structure of arrays returned by generate_agents_batch, or a
+            list of AgentCharacteristics
+        csv_path: The file to write
+        encode_categoricals: Write categoricals as codes plus a legend file
+    
+    Returns:
+        The columns that were written
+    """
+    batch = agents if isinstance(agents, dict) else agents_to_batch(agents)
+    num_agents = len(batch["age"])
+    columns = {"id": np.arange(1, num_agents + 1), **batch_to_columns(batch, encode_categoricals)}
+    
+    if encode_categoricals:
+        with open(f"{csv_path}.legend.json", "w") as legend_file:
+            json.dump(CATEGORICAL_DOMAINS, legend_file, indent=2)
+        # pyarrow has no float_format, so the compact encoding always goes through pandas
+        pd.DataFrame(columns).to_csv(
+            csv_path, index=False, lineterminator="\n", chunksize=CSV_CHUNK_SIZE, float_format="%.6g"
+        )
+    elif pa is not None:
+        pa_csv.write_csv(pa.table(columns), str(csv_path))
+    else:
+        pd.DataFrame(columns).to_csv(csv_path, index=False, lineterminator="\n", chunksize=CSV_CHUNK_SIZE)
+    
+    return columns
+
+def analyze_agents_soa(cols: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Analyze a generate_agents_batch structure of arrays.
+    
+    Args:
+        cols: The batch columns
+    
+    Returns:
+        A dictionary with "categorical_counts" (category -> count, observed
+        categories only) and "numerical_stats" (mean, min, max, quartiles and
+        a 10-bin histogram per numerical column)
+    """
+    categorical_counts = {}
+    for name, table in CATEGORY_TABLES.items():
+        codes, counts = np.unique(cols[f"{name}_code"], return_counts=True)
+        categorical_counts[name] = dict(zip(table[codes].tolist(), counts.tolist()))
+    
+    numerical_stats = {}
+    for name in NUMERICAL_COLUMNS:
+        values = cols[name]
+        p25, p50, p75 = np.percentile(values, [25, 50, 75])
+        numerical_stats[name] = {
+            "mean": values.mean(),
+            "min": values.min(),
+            "max": values.max(),
+            "percentiles": {
+                "25th": p25,
+                "50th": p50,
+                "75th": p75
+            },
+            "histogram": np.histogram(values, bins=10)[0].tolist()
+        }
+    
+    return {
+        "categorical_counts": categorical_counts,
+        "numerical_stats": numerical_stats
+    }
+
+def analyze_agents(agents: List[AgentCharacteristics]) -> Dict[str, Any]:
+    """
+    Analyze a list of agents.
+    
+    Args:
+        agents: The agents to analyze
+    
+    Returns:
+        The same statistics as analyze_agents_soa
+    """
+    return analyze_agents_soa(agents_to_batch(agents))
+
+def analyze_agent_stream(agents: Iterable[AgentCharacteristics], sample_rate: float = 0.3) -> Dict[str, Any]:
+    """
+    Analyze a stream of agents while keeping only a fraction of their values.
+    
+    Categorical counts, means (Welford's running update), minimums and maximums
+    are exact over the whole stream. Percentiles and histograms are estimated
+    from an evenly spaced sample_rate fraction of the agents, so memory grows
+    with sample_rate * N instead of N. Use this for populations too large to
+    hold in memory at once.
+    
+    Args:
+        agents: The agents to analyze, consumed once
+        sample_rate: The fraction of agents kept for the percentiles and histograms
+    
+    Returns:
+        The same statistics as analyze_agents_soa
+    """
+    categorical_counts = {name: defaultdict(int) for name, _ in CATEGORICAL_GETTERS}
+    num_fields = len(NUMERICAL_GETTERS)
+    means = [0.0] * num_fields
+    mins = [float("inf")] * num_fields
+    maxs = [float("-inf")] * num_fields
+    sampled = []
+    
+    count = 0
+    accumulator = 0.0
+    for agent in agents:
+        for name, get in CATEGORICAL_GETTERS:
+            categorical_counts[name][get(agent)] += 1
+        
+        count += 1
+        row = [get(agent) for _, get in NUMERICAL_GETTERS]
+        for j, value in enumerate(row):
+            means[j] += (value - means[j]) / count
+            if value < mins[j]:
+                mins[j] = value
+            if value > maxs[j]:
+                maxs[j] = value
+        
+        # Keep every (1 / sample_rate)-th agent for the distribution estimates
+        accumulator += sample_rate
+        if accumulator >= 1.0:
+            accumulator -= 1.0
+            sampled.append(row)
+    
+    sampled = np.array(sampled, dtype=np.float64).reshape(-1, num_fields)
+    
+    numerical_stats = {}
+    for j, (name, _) in enumerate(NUMERICAL_GETTERS):
+        p25, p50, p75 = np.percentile(sampled[:, j], [25, 50, 75])
+        numerical_stats[name] = {
+            "mean": means[j],
+            "min": mins[j],
+            "max": maxs[j],
+            "percentiles": {
+                "25th": p25,
+                "50th": p50,
+                "75th": p75
+            },
+            "histogram": np.histogram(sampled[:, j], bins=10)[0].tolist()
+        }
+    
+    return {
+        "categorical_counts": {name: dict(counts) for name, counts in categorical_counts.items()},
+        "numerical_stats": numerical_stats
+    }
+
+def expected_mean(distribution: DistributionData) -> float:
+    """
+    Probability-weighted mean of a distribution's points.
+    
+    Args:
+        distribution: The probability distribution
+    
+    Returns:
+        The mean the distribution specifies
+    """
+    num_points = len(distribution.points)
+    values = np.fromiter((p.value for p in distribution.points), dtype=np.float64, count=num_points)
+    probabilities = np.fromiter((p.probability for p in distribution.points), dtype=np.float64, count=num_points)
+    return float(values @ probabilities)
+
+def interpolation_bias(distribution: DistributionData) -> float:
+    """
+    How far below expected_mean the sampler's mean sits.
+    
+    Sampling inverts a piecewise-linear CDF, so draws that land on a point's
+    probability mass interpolate from the previous point's value instead of
+    taking the point's own value. Each point past the first therefore
+    contributes, on average, half the gap to its lower neighbour less than
+    its value. Mean checks against expected_mean should allow for this on
+    top of their sampling-noise tolerance.
+    
+    Args:
+        distribution: The probability distribution
+    
+    Returns:
+        The (non-negative) gap between expected_mean and the sampled mean
+    """
+    compiled = compile_distribution(distribution)
+    return float(np.diff(compiled.cdf) @ np.diff(compiled.values) / 2)
+
+def compare_with_summary(
+    agents_stats: Dict[str, Any],
+    demographic: DemographicDistribution,
+    num_agents: int
+) -> Dict[str, Any]:
+    """
+    Compare agent statistics with the population summary.
+    
+    Args:
+        agents_stats: Statistics from analyze_agents or analyze_agents_soa
+        demographic: The demographic distribution the agents were drawn from
+        num_agents: The number of agents analyzed
+    
+    Returns:
+        A dictionary with the "categorical_comparison" and "numerical_comparison"
+        per characteristic, and the "summary_profiles" names, counts and percentages
+    """
+    # Generate the population summary
+    summary = summarize_population(demographic, num_agents, 4)
+    
+    # Extract expected categorical distributions: profile counts (P) times
+    # each category's profile-by-subcategory percentage matrix (P x K)
+    profile_counts = np.array([profile.count for profile in summary.profiles], dtype=np.float64)
+    expected_categorical = {}
+    for category in ["race_ethnicity", "gender", "religion", "urbanization", "education_style", "employment"]:
+        breakdowns = [getattr(profile, category) for profile in summary.profiles]
+        subcats = sorted(set().union(*breakdowns))
+        percentages = np.array([[breakdown.get(subcat, 0.0) for subcat in subcats] for breakdown in breakdowns])
+    
+        # Convert to integer counts
+        expected_counts = np.round(profile_counts @ percentages / 100).astype(int)
+        expected_categorical[category] = dict(zip(subcats, expected_counts.tolist()))
+    
+    # Compare categorical distributions
+    categorical_comparison = {}
+    for category in ["race_ethnicity", "gender", "religion", "urbanization", "education_style"]:
+        expected = expected_categorical[category]
+        actual = agents_stats["categorical_counts"][category]
+    
+        # Calculate differences over the category's fixed domain
+        differences = {}
+        for subcat in CATEGORICAL_DOMAINS[category]:
+            expected_count = expected.get(subcat, 0)
+            actual_count = actual.get(subcat, 0)
+            differences[subcat] = actual_count - expected_count
+    
+        categorical_comparison[category] = {
+            "expected": expected,
+            "actual": actual,
+            "differences": differences
+        }
+    
+    # Compare numerical distributions
+    numerical_comparison = {}
+    
+    # Calculate expected numerical statistics from the demographic distribution
+    numerical = demographic.numerical
+    political = numerical.political_affiliation
+    distributions = {
+        "age": numerical.age,
+        "income_level": numerical.income_level,
+        "years_of_education": numerical.years_of_education,
+        "religiosity": numerical.religiosity,
+        "political_economic": political.economic,
+        "political_governance": political.governance,
+        "political_cultural": political.cultural
+    }
+    expected_numerical = {
+        category: {"mean": expected_mean(distribution), "interpolation_bias": interpolation_bias(distribution)}
+        for category, distribution in distributions.items()
+    }
+    
+    # Compare numerical statistics
+    for category in NUMERICAL_COLUMNS:
+        expected_stats = expected_numerical.get(category, {})
+        actual_stats = agents_stats["numerical_stats"][category]
+    
+        numerical_comparison[category] = {
+            "expected_mean": expected_stats.get("mean"),
+            "interpolation_bias": expected_stats.get("interpolation_bias"),
+            "actual_mean": actual_stats["mean"],
+            "actual_min": actual_stats["min"],
+            "actual_max": actual_stats["max"],
+            "actual_percentiles": actual_stats["percentiles"]
+        }
+    
+    return {
+        "categorical_comparison": categorical_comparison,
+        "numerical_comparison": numerical_comparison,
+        "summary_profiles": [
+            {
+                "name": profile.name,
+                "count": profile.count,
+                "percentage": profile.percentage
+            }
+            for profile in summary.profiles
+        ]
+    }
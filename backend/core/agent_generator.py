@@ -1,9 +1,13 @@
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, NamedTuple
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import repeat
 import numpy as np
 import hashlib
 from sqlalchemy.orm import Session
 import json
 import math
+import sys
 
 from backend.core.schemas import (
     DemographicDistribution,
@@ -18,10 +22,43 @@ from backend.core.schemas import (
     AgentNumericalCharacteristics,
     AgentCategoricalCharacteristics,
     PoliticalAffiliation,
-    AgentCreate
+    AgentCreate,
+    RaceEthnicity,
+    Gender,
+    Religion,
+    Urbanization,
+    EducationStyle,
+    EmploymentStyle
 )
+from backend.core.alias import build_alias_table, alias_sample
 from backend.db.models import Agent
 
+# Fixed category domains; batch-generated categoricals are int8 codes indexing these tables
+CATEGORY_TABLES = {
+    "race_ethnicity": np.array([e.value for e in RaceEthnicity]),
+    "gender": np.array([e.value for e in Gender]),
+    "religion": np.array([e.value for e in Religion]),
+    "urbanization": np.array([e.value for e in Urbanization]),
+    "education_style": np.array([e.value for e in EducationStyle]),
+    "employment_style": np.array([e.value for e in EmploymentStyle])
+}
+
+@lru_cache(maxsize=1024)
+def seed_to_int(seed: str) -> int:
+    """
+    Hash a string seed to a 32-bit integer.
+    
+    Memoized, so generators rebuilt from a recurring seed skip the hash.
+    
+    Args:
+        seed: A string seed
+        
+    Returns:
+        The integer seed
+    """
+    hash_obj = hashlib.md5(seed.encode())
+    return int(hash_obj.hexdigest(), 16) % (2**32)
+
 class DeterministicRandom:
     """
     A deterministic random number generator that produces the same sequence
@@ -34,12 +71,40 @@ class DeterministicRandom:
         Args:
             seed: A string seed to initialize the random number generator
         """
-        # Create a hash of the seed to get a 32-bit integer
-        hash_obj = hashlib.md5(seed.encode())
-        seed_int = int(hash_obj.hexdigest(), 16) % (2**32)
+        # Initialize a PCG64 generator with a hash of the seed; numpy expands it
+        # through a SeedSequence, which is much cheaper than seeding a Mersenne Twister
+        self.seed = seed_to_int(seed)
+        self.rng = np.random.default_rng(self.seed)
+    
+    @classmethod
+    def from_parent(cls, parent: "DeterministicRandom", stream_id: int) -> "DeterministicRandom":
+        """
+        Derive an independent child generator from a parent generator.
         
-        # Initialize the numpy random number generator with the seed
-        self.rng = np.random.RandomState(seed_int)
+        Children are PCG64 streams jumped ahead from the parent's initial state.
+        Jumping is a constant-time state update, cheaper than hashing a new
+        string and seeding a fresh generator for every child.
+        
+        Args:
+            parent: A generator created from a string seed
+            stream_id: The index of the child stream; the same parent seed and
+                stream_id always give the same sequence
+            
+        Returns:
+            A new deterministic random number generator
+            
+        Raises:
+            ValueError: If the parent was itself derived with from_parent
+        """
+        # PCG64(None) would silently seed from OS entropy
+        if parent.seed is None:
+            raise ValueError("from_parent requires a parent created from a string seed")
+        
+        child = cls.__new__(cls)
+        child.seed = None
+        # Jump at least once so child 0 does not replay the parent's own stream
+        child.rng = np.random.Generator(np.random.PCG64(parent.seed).jumped(stream_id + 1))
+        return child
     
     def random(self) -> float:
         """
@@ -50,6 +115,20 @@ class DeterministicRandom:
         """
         return self.rng.random()
     
+    def uniforms(self, size: int) -> np.ndarray:
+        """
+        Generate an array of random floats in the range [0, 1).
+        
+        The values are the same as size successive calls to random().
+        
+        Args:
+            size: The number of floats to generate
+            
+        Returns:
+            An array of random floats
+        """
+        return self.rng.random(size)
+    
     def randint(self, low: int, high: int) -> int:
         """
         Generate a random integer in the range [low, high).
@@ -61,7 +140,7 @@ class DeterministicRandom:
         Returns:
             A random integer
         """
-        return self.rng.randint(low, high)
+        return int(self.rng.integers(low, high))
     
     def choice(self, items: List[Any], p: Optional[List[float]] = None) -> Any:
         """
@@ -85,6 +164,286 @@ class DeterministicRandom:
         """
         self.rng.shuffle(items)
 
+# Precomputed sampling tables. They mirror the attribute layout of DemographicDistribution,
+# so the generate_* functions accept either form unchanged.
+
+@dataclass(frozen=True)
+class CompiledDistribution:
+    """Point values sorted ascending with their cumulative probabilities."""
+    values: np.ndarray
+    cdf: np.ndarray
+
+@dataclass(frozen=True)
+class CompiledCategorical:
+    """Categories with their cumulative probabilities, normalized to end at 1."""
+    categories: Tuple[str, ...]
+    cdf: np.ndarray
+
+@dataclass(frozen=True)
+class CompiledPoliticalAffiliation:
+    economic: CompiledDistribution
+    governance: CompiledDistribution
+    cultural: CompiledDistribution
+
+@dataclass(frozen=True)
+class CompiledNumerical:
+    age: CompiledDistribution
+    income_level: CompiledDistribution
+    years_of_education: CompiledDistribution
+    religiosity: CompiledDistribution
+    political_affiliation: CompiledPoliticalAffiliation
+
+@dataclass(frozen=True)
+class CompiledCategoricalCharacteristics:
+    race_ethnicity: CompiledCategorical
+    gender: CompiledCategorical
+    religion: CompiledCategorical
+    urbanization: CompiledCategorical
+    education_style: CompiledCategorical
+    employment_style: CompiledCategorical
+    location: str
+
+@dataclass(frozen=True)
+class PackedTables:
+    """Several CDFs stacked row-wise, padded with +inf so padding never matches a draw."""
+    values: np.ndarray
+    cdf: np.ndarray
+    last: np.ndarray
+
+@dataclass(frozen=True)
+class CompiledDemographic:
+    numerical: CompiledNumerical
+    categorical: CompiledCategoricalCharacteristics
+    # The same tables stacked in sampling order, for one vectorized lookup per agent
+    packed_numerical: PackedTables
+    packed_categorical: PackedTables
+
+# Validation-free agent records with the same attribute layout as AgentCharacteristics
+
+class FastPoliticalAffiliation(NamedTuple):
+    economic: float
+    governance: float
+    cultural: float
+
+class FastNumericalCharacteristics(NamedTuple):
+    age: float
+    income_level: float
+    years_of_education: float
+    religiosity: float
+    political_affiliation: FastPoliticalAffiliation
+
+class FastCategoricalCharacteristics(NamedTuple):
+    race_ethnicity: str
+    gender: str
+    religion: str
+    urbanization: str
+    education_style: str
+    employment_style: str
+    location: str
+
+class AgentCharacteristicsFast(NamedTuple):
+    numerical: FastNumericalCharacteristics
+    categorical: FastCategoricalCharacteristics
+
+def compile_distribution(distribution: DistributionData) -> CompiledDistribution:
+    """
+    Precompute the sorted values and CDF that sample_from_distribution needs.
+    
+    Nothing is cached, since distributions are mutable models; callers that
+    sample many agents compile once with compile_demographic and pass the
+    result along.
+    
+    Args:
+        distribution: The probability distribution
+        
+    Returns:
+        The compiled distribution
+    """
+    sorted_points = sorted(distribution.points, key=lambda p: p.value)
+    return CompiledDistribution(
+        values=np.array([p.value for p in sorted_points], dtype=np.float64),
+        cdf=np.cumsum([p.probability for p in sorted_points])
+    )
+
+def compile_categorical(distribution: List[CategoricalProbabilityWithEnum]) -> CompiledCategorical:
+    """
+    Precompute the normalized CDF that sample_from_categorical needs.
+    
+    Args:
+        distribution: The categorical probability distribution
+        
+    Returns:
+        The compiled categorical distribution
+    """
+    # Normalized exactly as numpy's Generator.choice does, so draws match it
+    cdf = np.cumsum(np.array([cat_prob.probability for cat_prob in distribution], dtype=np.float64))
+    cdf /= cdf[-1]
+    return CompiledCategorical(
+        # Interned, so every sampled agent shares one string object per category
+        categories=tuple(sys.intern(cat_prob.category) for cat_prob in distribution),
+        cdf=cdf
+    )
+
+def numerical_tables(numerical: CompiledNumerical) -> List[CompiledDistribution]:
+    """
+    List the compiled numerical distributions in the order agents sample them.
+    
+    Args:
+        numerical: The compiled numerical distributions
+        
+    Returns:
+        Age, income, education, religiosity and the three political axes
+    """
+    political = numerical.political_affiliation
+    return [
+        numerical.age,
+        numerical.income_level,
+        numerical.years_of_education,
+        numerical.religiosity,
+        political.economic,
+        political.governance,
+        political.cultural
+    ]
+
+def categorical_tables(categorical: CompiledCategoricalCharacteristics) -> List[CompiledCategorical]:
+    """
+    List the compiled categorical distributions in the order agents sample them.
+    
+    Args:
+        categorical: The compiled categorical distributions
+        
+    Returns:
+        Race/ethnicity, gender, religion, urbanization, education and employment
+    """
+    return [
+        categorical.race_ethnicity,
+        categorical.gender,
+        categorical.religion,
+        categorical.urbanization,
+        categorical.education_style,
+        categorical.employment_style
+    ]
+
+def pack_tables(tables: List[Union[CompiledDistribution, CompiledCategorical]]) -> PackedTables:
+    """
+    Stack compiled CDFs (and point values, where present) into padded 2D arrays.
+    
+    Args:
+        tables: The compiled distributions, one per row
+        
+    Returns:
+        The packed tables
+    """
+    width = max(len(table.cdf) for table in tables)
+    values = np.zeros((len(tables), width))
+    cdf = np.full((len(tables), width), np.inf)
+    
+    for row, table in enumerate(tables):
+        cdf[row, :len(table.cdf)] = table.cdf
+        if isinstance(table, CompiledDistribution):
+            values[row, :len(table.values)] = table.values
+    
+    return PackedTables(
+        values=values,
+        cdf=cdf,
+        last=np.array([len(table.cdf) - 1 for table in tables])
+    )
+
+def sample_packed_distributions(packed: PackedTables, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Sample one value from each packed numerical distribution at once.
+    
+    Row-wise equivalent of sample_from_compiled_distribution: the same segment
+    search and the same slope arithmetic as np.interp, so results are identical.
+    
+    Args:
+        packed: The packed numerical distributions
+        uniforms: One uniform draw per row
+        
+    Returns:
+        One sampled value per row
+    """
+    rows = np.arange(len(uniforms))
+    
+    # First index whose cumulative probability is >= the draw; padding is +inf
+    idx = (packed.cdf < uniforms[:, None]).sum(axis=1)
+    beyond = idx > packed.last
+    idx = np.minimum(idx, packed.last)
+    prev = np.maximum(idx - 1, 0)
+    
+    cum_prob = packed.cdf[rows, idx]
+    prev_cum_prob = packed.cdf[rows, prev]
+    value = packed.values[rows, idx]
+    prev_value = packed.values[rows, prev]
+    
+    # Rows that take an exact point value may divide by zero here; np.where discards them
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (value - prev_value) / (cum_prob - prev_cum_prob)
+        interpolated = slope * (uniforms - prev_cum_prob) + prev_value
+    
+    exact = (idx == 0) | (uniforms == cum_prob) | beyond
+    return np.where(exact, value, interpolated)
+
+def sample_packed_categoricals(packed: PackedTables, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Sample one category index from each packed categorical distribution at once.
+    
+    Args:
+        packed: The packed categorical distributions
+        uniforms: One uniform draw per row
+        
+    Returns:
+        One category index per row
+    """
+    # Right-sided search, as in Generator.choice
+    return (packed.cdf <= uniforms[:, None]).sum(axis=1)
+
+def compile_demographic(demographic: DemographicDistribution) -> CompiledDemographic:
+    """
+    Precompute the sampling tables for every characteristic of a demographic.
+    
+    Generating many agents from a compiled demographic skips re-sorting points
+    and rebuilding CDFs for each agent, and yields exactly the same agents as
+    the uncompiled distribution for the same random sequence.
+    
+    Args:
+        demographic: The demographic distribution to compile
+        
+    Returns:
+        The compiled demographic
+    """
+    numerical = demographic.numerical
+    political = numerical.political_affiliation
+    categorical = demographic.categorical
+    
+    compiled_numerical = CompiledNumerical(
+        age=compile_distribution(numerical.age),
+        income_level=compile_distribution(numerical.income_level),
+        years_of_education=compile_distribution(numerical.years_of_education),
+        religiosity=compile_distribution(numerical.religiosity),
+        political_affiliation=CompiledPoliticalAffiliation(
+            economic=compile_distribution(political.economic),
+            governance=compile_distribution(political.governance),
+            cultural=compile_distribution(political.cultural)
+        )
+    )
+    compiled_categorical = CompiledCategoricalCharacteristics(
+        race_ethnicity=compile_categorical(categorical.race_ethnicity),
+        gender=compile_categorical(categorical.gender),
+        religion=compile_categorical(categorical.religion),
+        urbanization=compile_categorical(categorical.urbanization),
+        education_style=compile_categorical(categorical.education_style),
+        employment_style=compile_categorical(categorical.employment_style),
+        location=categorical.location
+    )
+    
+    return CompiledDemographic(
+        numerical=compiled_numerical,
+        categorical=compiled_categorical,
+        packed_numerical=pack_tables(numerical_tables(compiled_numerical)),
+        packed_categorical=pack_tables(categorical_tables(compiled_categorical))
+    )
+
 def generate_agents(
     demographic: DemographicsBase,
     session_id: int,
@@ -105,11 +464,12 @@ def generate_agents(
     Returns:
         A list of the generated Agent objects
     """
-    # Convert the stored characteristics to DemographicDistribution
-    demographic_distribution = DemographicDistribution(
+    # Convert the stored characteristics to DemographicDistribution, compiled once
+    # so each agent samples from precomputed CDFs
+    demographic_distribution = compile_demographic(DemographicDistribution(
         numerical=demographic.numerical_characteristics,
         categorical=demographic.categorical_characteristics
-    )
+    ))
     
     # Create a deterministic random number generator
     # Use the demographic ID and name as the seed for determinism
@@ -138,35 +498,88 @@ def generate_agents(
     return agents
 
 def generate_agent_characteristics(
-    demographic: DemographicDistribution,
-    random: DeterministicRandom
-) -> AgentCharacteristics:
+    demographic: Union[DemographicDistribution, CompiledDemographic],
+    random: DeterministicRandom,
+    fast: bool = False
+) -> Union[AgentCharacteristics, AgentCharacteristicsFast]:
     """
     Generate characteristics for a single agent.
     
     Args:
-        demographic: The demographic distribution to sample from
+        demographic: The demographic distribution to sample from, optionally
+            precompiled with compile_demographic
         random: A deterministic random number generator
+        fast: Return named tuples instead of validated Pydantic models
         
     Returns:
         The agent's characteristics
     """
+    if isinstance(demographic, CompiledDemographic):
+        return generate_compiled_agent_characteristics(demographic, random, fast)
+    
     # Generate numerical characteristics
     numerical_chars = generate_numerical_characteristics(
-        demographic.numerical, random
+        demographic.numerical, random, fast
     )
     
     # Generate categorical characteristics
     categorical_chars = generate_categorical_characteristics(
-        demographic.categorical, random
+        demographic.categorical, random, fast
     )
     
+    if fast:
+        return AgentCharacteristicsFast(numerical_chars, categorical_chars)
+    
     # Combine into AgentCharacteristics
     return AgentCharacteristics(
         numerical=numerical_chars,
         categorical=categorical_chars
     )
 
+def generate_compiled_agent_characteristics(
+    demographic: CompiledDemographic,
+    random: DeterministicRandom,
+    fast: bool = False
+) -> Union[AgentCharacteristics, AgentCharacteristicsFast]:
+    """
+    Generate characteristics for a single agent from a compiled demographic.
+    
+    Draws all of the agent's uniforms at once and samples every field with two
+    vectorized lookups over the packed tables. Consumes the same random values
+    as the per-field path, so the agent is identical.
+    
+    Args:
+        demographic: The compiled demographic distribution to sample from
+        random: A deterministic random number generator
+        fast: Return named tuples instead of validated Pydantic models
+        
+    Returns:
+        The agent's characteristics
+    """
+    packed_numerical = demographic.packed_numerical
+    num_numerical = len(packed_numerical.last)
+    uniforms = random.uniforms(num_numerical + len(demographic.packed_categorical.last))
+    
+    values = sample_packed_distributions(packed_numerical, uniforms[:num_numerical])
+    codes = sample_packed_categoricals(demographic.packed_categorical, uniforms[num_numerical:])
+    categories = [
+        table.categories[code]
+        for table, code in zip(categorical_tables(demographic.categorical), codes.tolist())
+    ]
+    
+    numerical_chars = build_numerical_characteristics(*values.tolist(), fast=fast)
+    categorical_chars = build_categorical_characteristics(
+        *categories, demographic.categorical.location, fast
+    )
+    
+    if fast:
+        return AgentCharacteristicsFast(numerical_chars, categorical_chars)
+    
+    return AgentCharacteristics(
+        numerical=numerical_chars,
+        categorical=categorical_chars
+    )
+
 def round_to_nearest(value: float, nearest: float) -> float:
     """
     Round a value to the nearest specified increment.
@@ -182,49 +595,78 @@ def round_to_nearest(value: float, nearest: float) -> float:
 
 def generate_numerical_characteristics(
     numerical_distribution: NumericalCharacteristicsDistribution,
-    random: DeterministicRandom
-) -> AgentNumericalCharacteristics:
+    random: DeterministicRandom,
+    fast: bool = False
+) -> Union[AgentNumericalCharacteristics, FastNumericalCharacteristics]:
     """
     Generate numerical characteristics for an agent.
     
     Args:
         numerical_distribution: The numerical distribution to sample from
         random: A deterministic random number generator
+        fast: Return a named tuple instead of a validated Pydantic model
         
     Returns:
         The agent's numerical characteristics
     """
-    # Sample age from distribution and round to nearest whole number
-    age = round(sample_from_distribution(numerical_distribution.age, random))
+    political_distribution = numerical_distribution.political_affiliation
     
-    # Sample income from distribution and round to nearest hundred
-    income = round_to_nearest(
-        sample_from_distribution(numerical_distribution.income_level, random),
-        100
+    return build_numerical_characteristics(
+        age=sample_from_distribution(numerical_distribution.age, random),
+        income=sample_from_distribution(numerical_distribution.income_level, random),
+        education=sample_from_distribution(numerical_distribution.years_of_education, random),
+        religiosity=sample_from_distribution(numerical_distribution.religiosity, random),
+        economic=sample_from_distribution(political_distribution.economic, random),
+        governance=sample_from_distribution(political_distribution.governance, random),
+        cultural=sample_from_distribution(political_distribution.cultural, random),
+        fast=fast
     )
+
+def build_numerical_characteristics(
+    age: float,
+    income: float,
+    education: float,
+    religiosity: float,
+    economic: float,
+    governance: float,
+    cultural: float,
+    fast: bool = False
+) -> Union[AgentNumericalCharacteristics, FastNumericalCharacteristics]:
+    """
+    Round sampled numerical values and assemble an agent's numerical characteristics.
     
-    # Sample education from distribution
-    education = sample_from_distribution(numerical_distribution.years_of_education, random)
+    Args:
+        age: The sampled age
+        income: The sampled income level
+        education: The sampled years of education
+        religiosity: The sampled religiosity
+        economic: The sampled economic political affiliation
+        governance: The sampled governance political affiliation
+        cultural: The sampled cultural political affiliation
+        fast: Return a named tuple instead of a validated Pydantic model
+        
+    Returns:
+        The agent's numerical characteristics
+    """
+    # Round age to nearest whole number
+    age = round(age)
     
-    # Sample religiosity from distribution and round to nearest 0.5
-    religiosity = round_to_nearest(
-        sample_from_distribution(numerical_distribution.religiosity, random),
-        0.5
-    )
+    # Round income to nearest hundred
+    income = round_to_nearest(income, 100)
     
-    # Sample political affiliation and round to nearest 0.05
-    economic = round_to_nearest(
-        sample_from_distribution(numerical_distribution.political_affiliation.economic, random),
-        0.05
-    )
-    governance = round_to_nearest(
-        sample_from_distribution(numerical_distribution.political_affiliation.governance, random),
-        0.05
-    )
-    cultural = round_to_nearest(
-        sample_from_distribution(numerical_distribution.political_affiliation.cultural, random),
-        0.05
-    )
+    # Round religiosity to nearest 0.5
+    religiosity = round_to_nearest(religiosity, 0.5)
+    
+    # Round political affiliation to nearest 0.05
+    economic = round_to_nearest(economic, 0.05)
+    governance = round_to_nearest(governance, 0.05)
+    cultural = round_to_nearest(cultural, 0.05)
+    
+    if fast:
+        return FastNumericalCharacteristics(
+            age, income, education, religiosity,
+            FastPoliticalAffiliation(economic, governance, cultural)
+        )
     
     # Create the political affiliation object
     political_affiliation = PoliticalAffiliation(
@@ -244,14 +686,16 @@ def generate_numerical_characteristics(
 
 def generate_categorical_characteristics(
     categorical_distribution: CategoricalCharacteristicsDistribution,
-    random: DeterministicRandom
-) -> AgentCategoricalCharacteristics:
+    random: DeterministicRandom,
+    fast: bool = False
+) -> Union[AgentCategoricalCharacteristics, FastCategoricalCharacteristics]:
     """
     Generate categorical characteristics for an agent.
     
     Args:
         categorical_distribution: The categorical distribution to sample from
         random: A deterministic random number generator
+        fast: Return a named tuple instead of a validated Pydantic model
         
     Returns:
         The agent's categorical characteristics
@@ -286,6 +730,43 @@ def generate_categorical_characteristics(
         categorical_distribution.employment_style, random
     )
     
+    return build_categorical_characteristics(
+        race_ethnicity, gender, religion, urbanization,
+        education_style, employment_style, categorical_distribution.location, fast
+    )
+
+def build_categorical_characteristics(
+    race_ethnicity: str,
+    gender: str,
+    religion: str,
+    urbanization: str,
+    education_style: str,
+    employment_style: str,
+    location: str,
+    fast: bool = False
+) -> Union[AgentCategoricalCharacteristics, FastCategoricalCharacteristics]:
+    """
+    Assemble an agent's categorical characteristics from sampled categories.
+    
+    Args:
+        race_ethnicity: The sampled race/ethnicity
+        gender: The sampled gender
+        religion: The sampled religion
+        urbanization: The sampled urbanization
+        education_style: The sampled education style
+        employment_style: The sampled employment style
+        location: The agent's location
+        fast: Return a named tuple instead of a validated Pydantic model
+        
+    Returns:
+        The agent's categorical characteristics
+    """
+    if fast:
+        return FastCategoricalCharacteristics(
+            race_ethnicity, gender, religion, urbanization,
+            education_style, employment_style, location
+        )
+    
     # Create the categorical characteristics object
     return AgentCategoricalCharacteristics(
         race_ethnicity=race_ethnicity,
@@ -294,80 +775,68 @@ def generate_categorical_characteristics(
         urbanization=urbanization,
         education_style=education_style,
         employment_style=employment_style,
-        location=categorical_distribution.location
+        location=location
     )
 
 def sample_from_distribution(
-    distribution: DistributionData,
+    distribution: Union[DistributionData, CompiledDistribution],
     random: DeterministicRandom
 ) -> float:
     """
     Sample a value from a distribution deterministically.
     
     Args:
-        distribution: The probability distribution
+        distribution: The probability distribution, optionally precompiled
         random: A deterministic random number generator
         
     Returns:
         A sampled value
     """
-    # Extract the distribution parameters
-    min_val, max_val = distribution.range
-    points = distribution.points
-    
-    # Sort points by value for quantile-based sampling
-    sorted_points = sorted(points, key=lambda p: p.value)
-    
-    # Calculate cumulative probabilities
-    cumulative_probs = []
-    cumulative_prob = 0
-    for point in sorted_points:
-        cumulative_prob += point.probability
-        cumulative_probs.append(cumulative_prob)
-    
-    # Generate a random value between 0 and 1
-    r = random.random()
-    
-    # Find the appropriate quantile
-    for i, cum_prob in enumerate(cumulative_probs):
-        if r <= cum_prob:
-            # If this is the first point or r is exactly at the cumulative probability,
-            # return the exact value
-            if i == 0 or r == cum_prob:
-                return sorted_points[i].value
-            
-            # Otherwise, interpolate between this point and the previous one
-            prev_cum_prob = cumulative_probs[i-1]
-            prev_value = sorted_points[i-1].value
-            curr_value = sorted_points[i].value
-            
-            # Calculate the position of r within the probability range
-            prob_range = cum_prob - prev_cum_prob
-            prob_position = (r - prev_cum_prob) / prob_range
-            
-            # Interpolate the value
-            value = prev_value + prob_position * (curr_value - prev_value)
-            
-            return value
+    if not isinstance(distribution, CompiledDistribution):
+        distribution = compile_distribution(distribution)
     
-    # If we get here, there was a rounding error and r > 1
-    # Return the last point's value
-    return sorted_points[-1].value
+    return sample_from_compiled_distribution(distribution, random)
+
+def sample_from_compiled_distribution(
+    distribution: CompiledDistribution,
+    random: DeterministicRandom
+) -> float:
+    """
+    Sample a value from a compiled distribution deterministically.
+    
+    The inverse CDF is piecewise linear between the distribution's points, so
+    it is evaluated with a single np.interp call. Draws below the first
+    cumulative probability take the first value and draws beyond the last
+    one (a total probability slightly below 1) take the last value.
+    
+    Args:
+        distribution: The compiled probability distribution
+        random: A deterministic random number generator
+        
+    Returns:
+        A sampled value
+    """
+    return float(np.interp(random.random(), distribution.cdf, distribution.values))
 
 def sample_from_categorical(
-    distribution: List[CategoricalProbabilityWithEnum],
+    distribution: Union[List[CategoricalProbabilityWithEnum], CompiledCategorical],
     random: DeterministicRandom
 ) -> str:
     """
     Sample a category from a categorical distribution deterministically.
     
     Args:
-        distribution: The categorical probability distribution
+        distribution: The categorical probability distribution, optionally precompiled
         random: A deterministic random number generator
         
     Returns:
         A sampled category
     """
+    if isinstance(distribution, CompiledCategorical):
+        # Same single uniform draw and right-sided search as Generator.choice
+        idx = int(np.searchsorted(distribution.cdf, random.random(), side='right'))
+        return distribution.categories[idx]
+    
     # Extract categories and probabilities
     categories = [cat_prob.category for cat_prob in distribution]
     probabilities = [cat_prob.probability for cat_prob in distribution]
@@ -375,6 +844,241 @@ def sample_from_categorical(
     # Choose a category based on the probabilities
     return random.choice(categories, p=probabilities)
 
+def sample_batch_from_distribution(
+    distribution: DistributionData,
+    rng: np.random.Generator,
+    size: int
+) -> np.ndarray:
+    """
+    Draw many samples from a distribution at once.
+    
+    Uses the same piecewise-linear inverse CDF as sample_from_distribution,
+    evaluated for all draws in a single np.interp call.
+    
+    Args:
+        distribution: The probability distribution
+        rng: A numpy random generator
+        size: The number of samples to draw
+        
+    Returns:
+        An array of sampled values
+    """
+    compiled = compile_distribution(distribution)
+    return np.interp(rng.random(size), compiled.cdf, compiled.values)
+
+def sample_batch_from_categorical(
+    distribution: List[CategoricalProbabilityWithEnum],
+    table: np.ndarray,
+    rng: np.random.Generator,
+    size: int
+) -> np.ndarray:
+    """
+    Draw many category codes from a categorical distribution at once.
+    
+    Uses an alias table, so each draw is constant time regardless of the
+    number of categories.
+    
+    Args:
+        distribution: The categorical probability distribution
+        table: The category domain the returned codes index into
+        rng: A numpy random generator
+        size: The number of samples to draw
+        
+    Returns:
+        An int8 array of codes into table
+    """
+    # Map each category in the distribution to its position in the domain table
+    domain_codes = np.array(
+        [np.flatnonzero(table == cat_prob.category)[0] for cat_prob in distribution],
+        dtype=np.int8
+    )
+    prob, alias = build_alias_table([cat_prob.probability for cat_prob in distribution])
+    
+    return domain_codes[alias_sample(prob, alias, rng, size)]
+
+def generate_agents_batch(
+    demographic: DemographicDistribution,
+    num_agents: int,
+    seed: str = "batch",
+    analyze: bool = False
+) -> Union[Dict[str, np.ndarray], Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """
+    Generate many agents at once as a structure of arrays.
+    
+    Each numerical characteristic is a float64 column and each categorical
+    characteristic is an int8 code column (keyed "<name>_code") indexing into
+    CATEGORY_TABLES. Rounding matches generate_numerical_characteristics.
+    
+    Args:
+        demographic: The demographic distribution to sample from
+        num_agents: The number of agents to generate
+        seed: A string seed; the same seed always produces the same columns
+        analyze: Also return summary statistics computed while the columns are built
+        
+    Returns:
+        A dictionary mapping column names to arrays of length num_agents, or a
+        (columns, stats) tuple when analyze is True. stats holds
+        "categorical_counts" (category -> count, observed categories only) and
+        "numerical_stats" (mean, std, min and max per numerical column).
+    """
+    rng = np.random.default_rng(seed_to_int(seed))
+    numerical = demographic.numerical
+    political = numerical.political_affiliation
+    categorical = demographic.categorical
+    
+    cols = {
+        "age": np.round(sample_batch_from_distribution(numerical.age, rng, num_agents)),
+        "income_level": np.round(sample_batch_from_distribution(numerical.income_level, rng, num_agents) / 100) * 100,
+        "years_of_education": sample_batch_from_distribution(numerical.years_of_education, rng, num_agents),
+        "religiosity": np.round(sample_batch_from_distribution(numerical.religiosity, rng, num_agents) / 0.5) * 0.5,
+        "political_economic": np.round(sample_batch_from_distribution(political.economic, rng, num_agents) / 0.05) * 0.05,
+        "political_governance": np.round(sample_batch_from_distribution(political.governance, rng, num_agents) / 0.05) * 0.05,
+        "political_cultural": np.round(sample_batch_from_distribution(political.cultural, rng, num_agents) / 0.05) * 0.05
+    }
+    
+    # Only the numerical columns exist at this point
+    numerical_stats = {}
+    if analyze:
+        for name, values in cols.items():
+            numerical_stats[name] = {
+                "mean": values.mean(),
+                "std": values.std(),
+                "min": values.min(),
+                "max": values.max()
+            }
+    
+    categorical_counts = {}
+    for name, table in CATEGORY_TABLES.items():
+        codes = sample_batch_from_categorical(
+            getattr(categorical, name), table, rng, num_agents
+        )
+        cols[f"{name}_code"] = codes
+        
+        if analyze:
+            counts = np.bincount(codes, minlength=len(table))
+            observed = np.flatnonzero(counts)
+            categorical_counts[name] = dict(zip(table[observed].tolist(), counts[observed].tolist()))
+    
+    cols["location"] = np.full(num_agents, categorical.location)
+    
+    if not analyze:
+        return cols
+    
+    return cols, {
+        "categorical_counts": categorical_counts,
+        "numerical_stats": numerical_stats
+    }
+
+def agents_from_batch(cols: Dict[str, np.ndarray]) -> List[AgentCharacteristics]:
+    """
+    Build AgentCharacteristics objects from a batch produced by generate_agents_batch.
+    
+    Only needed by callers that require per-agent Pydantic objects.
+    
+    Args:
+        cols: The structure-of-arrays batch
+        
+    Returns:
+        A list of agent characteristics, one per row
+    """
+    decoded = {name: table[cols[f"{name}_code"]] for name, table in CATEGORY_TABLES.items()}
+    
+    agents = []
+    for i in range(len(cols["age"])):
+        agents.append(AgentCharacteristics(
+            numerical=AgentNumericalCharacteristics(
+                age=cols["age"][i],
+                income_level=cols["income_level"][i],
+                years_of_education=cols["years_of_education"][i],
+                religiosity=cols["religiosity"][i],
+                political_affiliation=PoliticalAffiliation(
+                    economic=cols["political_economic"][i],
+                    governance=cols["political_governance"][i],
+                    cultural=cols["political_cultural"][i]
+                )
+            ),
+            categorical=AgentCategoricalCharacteristics(
+                location=cols["location"][i],
+                **{name: values[i] for name, values in decoded.items()}
+            )
+        ))
+    
+    return agents
+
+def batch_sample_cdf(cdf: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Map uniform draws to category indices through a cumulative distribution.
+    
+    Args:
+        cdf: Cumulative probabilities ending at 1
+        uniforms: Uniform draws in [0, 1)
+        
+    Returns:
+        An array of indices into the categories the CDF was built from
+    """
+    # Clip guards draws beyond a total probability slightly below 1
+    return np.minimum(np.searchsorted(cdf, uniforms, side='right'), len(cdf) - 1)
+
+def generate_agent_characteristics_batch(
+    demographic: CompiledDemographic,
+    num_agents: int,
+    seed: str = "batch"
+) -> List[AgentCharacteristicsFast]:
+    """
+    Generate characteristics for many agents from one matrix of uniform draws.
+    
+    Each column of the draw matrix drives one characteristic, so sampling is a
+    handful of vectorized interp/searchsorted calls. Results are lightweight
+    named tuples rather than validated Pydantic models. Rounding matches
+    generate_numerical_characteristics.
+    
+    Args:
+        demographic: The compiled demographic distribution to sample from
+        num_agents: The number of agents to generate
+        seed: A string seed; the same seed always produces the same agents
+        
+    Returns:
+        The agents' characteristics
+    """
+    numerical = numerical_tables(demographic.numerical)
+    categorical = categorical_tables(demographic.categorical)
+    
+    rng = np.random.default_rng(seed_to_int(seed))
+    uniforms = rng.random((num_agents, len(numerical) + len(categorical)))
+    
+    age, income, education, religiosity, economic, governance, cultural = (
+        np.interp(uniforms[:, j], table.cdf, table.values)
+        for j, table in enumerate(numerical)
+    )
+    numerical_columns = [
+        np.round(age),
+        np.round(income / 100) * 100,
+        education,
+        np.round(religiosity / 0.5) * 0.5,
+        np.round(economic / 0.05) * 0.05,
+        np.round(governance / 0.05) * 0.05,
+        np.round(cultural / 0.05) * 0.05
+    ]
+    
+    offset = len(numerical)
+    categorical_columns = [
+        np.array(table.categories, dtype=object)[batch_sample_cdf(table.cdf, uniforms[:, offset + k])]
+        for k, table in enumerate(categorical)
+    ]
+    
+    # Assemble the named tuples with C-level map/zip; tuple.__new__ skips the
+    # Python-level __new__ that calling a named tuple class goes through
+    numerical_lists = [column.tolist() for column in numerical_columns]
+    political = map(partial(tuple.__new__, FastPoliticalAffiliation), zip(*numerical_lists[4:]))
+    numerical_chars = map(
+        partial(tuple.__new__, FastNumericalCharacteristics), zip(*numerical_lists[:4], political)
+    )
+    categorical_chars = map(
+        partial(tuple.__new__, FastCategoricalCharacteristics),
+        zip(*(column.tolist() for column in categorical_columns), repeat(demographic.categorical.location))
+    )
+    return list(map(partial(tuple.__new__, AgentCharacteristicsFast), zip(numerical_chars, categorical_chars)))
+
 def create_agent_in_db(
     agent_characteristics: AgentCharacteristics,
     session_id: int,
@@ -412,7 +1116,6 @@ def create_agent_in_db(
     # Add to the database
     db.add(db_agent)
     db.commit()
-    db.refresh(db_agent)
     
     return db_agent
 
@@ -0,0 +1,69 @@
+"""
+Walker/Vose alias tables for constant-time sampling from discrete distributions.
+"""
+from typing import Sequence, Tuple
+import numpy as np
+
+def build_alias_table(probabilities: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build an alias table for a discrete distribution using Vose's method.
+    
+    Probabilities are normalized first, so they need not sum exactly to 1.
+    
+    Args:
+        probabilities: The probability of each outcome
+        
+    Returns:
+        A (prob, alias) pair of arrays, each with one entry per outcome
+    """
+    weights = np.asarray(probabilities, dtype=np.float64)
+    k = len(weights)
+    scaled = weights * k / weights.sum()
+    
+    prob = np.ones(k, dtype=np.float64)
+    alias = np.arange(k, dtype=np.int64)
+    
+    small = [i for i in range(k) if scaled[i] < 1.0]
+    large = [i for i in range(k) if scaled[i] >= 1.0]
+    
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        
+        prob[s] = scaled[s]
+        alias[s] = l
+        
+        # The large outcome donates the mass that fills up the small outcome's column
+        scaled[l] -= 1.0 - scaled[s]
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    
+    # Anything left over is a full column up to floating point error; prob stays 1
+    return prob, alias
+
+def alias_sample(
+    prob: np.ndarray,
+    alias: np.ndarray,
+    rng: np.random.Generator,
+    size: int
+) -> np.ndarray:
+    """
+    Draw outcome indices from an alias table.
+    
+    Each draw costs one column pick and one biased coin flip, independent of
+    the number of outcomes.
+    
+    Args:
+        prob: The acceptance probability of each column
+        alias: The fallback outcome of each column
+        rng: A numpy random generator
+        size: The number of samples to draw
+        
+    Returns:
+        An array of outcome indices
+    """
+    columns = rng.integers(0, len(prob), size=size)
+    accept = rng.random(size) < prob[columns]
+    return np.where(accept, columns, alias[columns])
@@ -1,9 +1,119 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, cast, Float, Integer
-from typing import Dict, List, Optional, Any, Union
+from sqlalchemy import and_, or_, Float, select, update, delete
+from typing import Dict, List, Optional, Any, Union, Iterator, Tuple
+import base64
 from backend.db import models
 from backend.core.schemas import AgentCreate, SurveyCreate, QuestionCreate, DemographicsCreate, SessionCreate, ResponseCreate
 
+# Server-side cap on page sizes so a caller-supplied limit can't scan unbounded rows
+MAX_PAGE_SIZE = 500
+
+# Whitelisted agent characteristics (the fields of AgentCharacteristics), mapped to prebuilt
+# filter expressions. Keys mirrored into generated columns on models.Agent use those (B-tree);
+# the rest read the JSONB. The political axes are nested under political_affiliation.
+NUM_FIELDS = {
+    'age': models.Agent.age,
+    'income_level': models.Agent.income_level,
+    'years_of_education': models.Agent.numerical_characteristics['years_of_education'].astext.cast(Float),
+    'religiosity': models.Agent.numerical_characteristics['religiosity'].astext.cast(Float),
+    'political_economic': models.Agent.numerical_characteristics[('political_affiliation', 'economic')].astext.cast(Float),
+    'political_governance': models.Agent.numerical_characteristics[('political_affiliation', 'governance')].astext.cast(Float),
+    'political_cultural': models.Agent.numerical_characteristics[('political_affiliation', 'cultural')].astext.cast(Float),
+}
+
+# None marks keys that only live in the JSONB; those are matched with @> so the GIN index applies
+CAT_FIELDS = {
+    'gender': models.Agent.gender,
+    'location': models.Agent.location,
+    'race_ethnicity': None,
+    'religion': None,
+    'urbanization': None,
+    'education_style': None,
+    'employment_style': None,
+}
+
+
+def _numerical_field(field: str):
+    """Look up the filter expression for a whitelisted numerical characteristic."""
+    field_value = NUM_FIELDS.get(field)
+    if field_value is None:
+        raise ValueError(f"Unknown numerical characteristic: {field!r}")
+    return field_value
+
+
+def _categorical_clause(field: str, value: str):
+    """Build the filter clause matching a whitelisted categorical characteristic."""
+    if field not in CAT_FIELDS:
+        raise ValueError(f"Unknown categorical characteristic: {field!r}")
+    column = CAT_FIELDS[field]
+    if column is not None:
+        return column == value
+    # Use the JSONB containment operator @> for more efficient filtering with GIN index
+    return models.Agent.categorical_characteristics.contains({field: value})
+
+
+# Pagination helpers
+def _clamp_limit(limit: int) -> int:
+    """Clamp a caller-supplied limit to [0, MAX_PAGE_SIZE]."""
+    return max(0, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Serialize the last seen row ID into an opaque cursor string.
+    
+    Args:
+        last_id: ID of the last row on the current page
+    
+    Returns:
+        URL-safe base64 cursor
+    """
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Deserialize a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string
+    
+    Returns:
+        The row ID encoded in the cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _paginate(query, model, cursor: Optional[str] = None, page_size: int = 100) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination on the model's ID to a query.
+    
+    Args:
+        query: Query to paginate
+        model: Mapped class whose ``id`` column is the pagination key
+        cursor: Cursor returned by the previous page, or None for the first page
+        page_size: Maximum number of rows to return (clamped to [1, MAX_PAGE_SIZE])
+    
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    # An empty page would still need a cursor, and it would skip the row the cursor was built from
+    page_size = max(1, _clamp_limit(page_size))
+    if cursor is not None:
+        query = query.filter(model.id > decode_cursor(cursor))
+    
+    # Fetch one extra row to detect whether another page exists
+    rows = query.order_by(model.id).limit(page_size + 1).all()
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1].id)
+    return rows, None
+
 
 # CRUD operations for Agents
 def create_agent(db: Session, agent_data: AgentCreate) -> models.Agent:
@@ -24,10 +134,33 @@ def create_agent(db: Session, agent_data: AgentCreate) -> models.Agent:
     )
     db.add(db_agent)
     db.commit()
-    db.refresh(db_agent)
     return db_agent
 
 
+def bulk_create_agents(db: Session, agents_data: List[AgentCreate]) -> List[models.Agent]:
+    """
+    Create several agents in the database with a single commit.
+    
+    Args:
+        db: Database session
+        agents_data: Pydantic models containing the agents' data
+    
+    Returns:
+        The created agent objects, in the same order as agents_data
+    """
+    db_agents = [
+        models.Agent(
+            session_id=agent_data.session_id,
+            numerical_characteristics=agent_data.numerical_characteristics,
+            categorical_characteristics=agent_data.categorical_characteristics
+        )
+        for agent_data in agents_data
+    ]
+    db.add_all(db_agents)
+    db.commit()
+    return db_agents
+
+
 def get_agents(db: Session, skip: int = 0, limit: int = 100) -> List[models.Agent]:
     """
     Retrieve all agents with pagination.
@@ -40,7 +173,38 @@ def get_agents(db: Session, skip: int = 0, limit: int = 100) -> List[models.Agen
     Returns:
         List of agent objects
     """
-    return db.query(models.Agent).offset(skip).limit(limit).all()
+    return db.query(models.Agent).offset(skip).limit(_clamp_limit(limit)).all()
+
+
+def iter_agents(db: Session, chunk: int = 1000) -> Iterator[models.Agent]:
+    """
+    Stream all agents without materializing the full result list.
+    
+    Args:
+        db: Database session
+        chunk: Number of rows fetched from the server per batch
+    
+    Yields:
+        Agent objects, one at a time
+    """
+    # yield_per uses a server-side cursor on PostgreSQL, so peak memory is O(chunk)
+    for agent in db.query(models.Agent).order_by(models.Agent.id).yield_per(chunk):
+        yield agent
+
+
+def get_agents_page(db: Session, cursor: Optional[str] = None, page_size: int = 100) -> Tuple[List[models.Agent], Optional[str]]:
+    """
+    Retrieve agents with keyset (cursor) pagination.
+    
+    Args:
+        db: Database session
+        cursor: Cursor returned by the previous page, or None for the first page
+        page_size: Maximum number of records to return
+    
+    Returns:
+        Tuple of (list of agent objects, cursor for the next page or None)
+    """
+    return _paginate(db.query(models.Agent), models.Agent, cursor, page_size)
 
 
 def get_agent_by_id(db: Session, agent_id: int) -> Optional[models.Agent]:
@@ -69,12 +233,20 @@ def update_agent(db: Session, agent_id: int, agent_data: Dict[str, Any]) -> Opti
     Returns:
         Updated agent object if found, None otherwise
     """
-    db_agent = get_agent_by_id(db, agent_id)
-    if db_agent:
-        for key, value in agent_data.items():
-            setattr(db_agent, key, value)
-        db.commit()
-        db.refresh(db_agent)
+    # An UPDATE with an empty SET clause is invalid SQL; nothing to change, so just look it up
+    if not agent_data:
+        return get_agent_by_id(db, agent_id)
+    
+    # Single UPDATE ... RETURNING round-trip instead of SELECT + UPDATE + refresh
+    stmt = (
+        update(models.Agent)
+        .where(models.Agent.id == agent_id)
+        .values(**agent_data)
+        .returning(*models.Agent.__table__.c)
+    )
+    orm_stmt = select(models.Agent).from_statement(stmt).execution_options(populate_existing=True)
+    db_agent = db.execute(orm_stmt).scalar_one_or_none()
+    db.commit()
     return db_agent
 
 
@@ -89,12 +261,10 @@ def delete_agent(db: Session, agent_id: int) -> bool:
     Returns:
         True if agent was deleted, False otherwise
     """
-    db_agent = get_agent_by_id(db, agent_id)
-    if db_agent:
-        db.delete(db_agent)
-        db.commit()
-        return True
-    return False
+    # Single DELETE round-trip; rowcount tells us whether the agent existed
+    result = db.execute(delete(models.Agent).where(models.Agent.id == agent_id))
+    db.commit()
+    return result.rowcount > 0
 
 
 def filter_agents_by_numerical(
@@ -118,12 +288,11 @@ def filter_agents_by_numerical(
     
     Returns:
         List of agent objects matching the filter
-    """
-    # Determine the appropriate cast type based on the value type
-    cast_type = Integer if isinstance(value, int) else Float
     
-    # Extract the field value and cast it to the appropriate type
-    field_value = cast(func.jsonb_extract_path_text(models.Agent.numerical_characteristics, field), cast_type)
+    Raises:
+        ValueError: If field is not a known numerical characteristic
+    """
+    field_value = _numerical_field(field)
     
     # Apply the appropriate operator
     if operator == '>':
@@ -137,7 +306,7 @@ def filter_agents_by_numerical(
     else:  # '='
         query = db.query(models.Agent).filter(field_value == value)
     
-    return query.offset(skip).limit(limit).all()
+    return query.offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def filter_agents_by_categorical(
@@ -159,14 +328,13 @@ def filter_agents_by_categorical(
     
     Returns:
         List of agent objects matching the filter
+    
+    Raises:
+        ValueError: If field is not a known categorical characteristic
     """
-    # Use the JSONB containment operator @> for more efficient filtering with GIN index
-    filter_json = {field: value}
-    query = db.query(models.Agent).filter(
-        models.Agent.categorical_characteristics.contains(filter_json)
-    )
+    query = db.query(models.Agent).filter(_categorical_clause(field, value))
     
-    return query.offset(skip).limit(limit).all()
+    return query.offset(skip).limit(_clamp_limit(limit)).all()
 
 
 # CRUD operations for Surveys
@@ -187,7 +355,6 @@ def create_survey(db: Session, survey_data: SurveyCreate) -> models.Survey:
     )
     db.add(db_survey)
     db.commit()
-    db.refresh(db_survey)
     return db_survey
 
 
@@ -203,7 +370,7 @@ def get_surveys(db: Session, skip: int = 0, limit: int = 100) -> List[models.Sur
     Returns:
         List of survey objects
     """
-    return db.query(models.Survey).offset(skip).limit(limit).all()
+    return db.query(models.Survey).offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def get_survey_by_id(db: Session, survey_id: int) -> Optional[models.Survey]:
@@ -280,7 +447,6 @@ def create_question(db: Session, question_data: QuestionCreate) -> models.Questi
     )
     db.add(db_question)
     db.commit()
-    db.refresh(db_question)
     return db_question
 
 
@@ -299,7 +465,7 @@ def get_questions_by_survey(db: Session, survey_id: int, skip: int = 0, limit: i
     """
     return db.query(models.Question).filter(
         models.Question.survey_id == survey_id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def get_question_by_id(db: Session, question_id: int) -> Optional[models.Question]:
@@ -335,7 +501,6 @@ def create_demographic(db: Session, demographic_data: DemographicsCreate) -> mod
     )
     db.add(db_demographic)
     db.commit()
-    db.refresh(db_demographic)
     return db_demographic
 
 
@@ -351,7 +516,7 @@ def get_demographics(db: Session, skip: int = 0, limit: int = 100) -> List[model
     Returns:
         List of demographic objects
     """
-    return db.query(models.Demographics).offset(skip).limit(limit).all()
+    return db.query(models.Demographics).offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def get_demographic_by_id(db: Session, demographic_id: int) -> Optional[models.Demographics]:
@@ -386,7 +551,6 @@ def create_session(db: Session, session_data: SessionCreate) -> models.Session:
     )
     db.add(db_session)
     db.commit()
-    db.refresh(db_session)
     return db_session
 
 
@@ -402,7 +566,7 @@ def get_sessions(db: Session, skip: int = 0, limit: int = 100) -> List[models.Se
     Returns:
         List of session objects
     """
-    return db.query(models.Session).offset(skip).limit(limit).all()
+    return db.query(models.Session).offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def get_session_by_id(db: Session, session_id: int) -> Optional[models.Session]:
@@ -440,7 +604,6 @@ def create_response(db: Session, response_data: ResponseCreate) -> models.Respon
     )
     db.add(db_response)
     db.commit()
-    db.refresh(db_response)
     return db_response
 
 
@@ -459,7 +622,26 @@ def get_responses_by_survey(db: Session, survey_id: int, skip: int = 0, limit: i
     """
     return db.query(models.Response).filter(
         models.Response.survey_id == survey_id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(_clamp_limit(limit)).all()
+
+
+def iter_responses_by_survey(db: Session, survey_id: int, chunk: int = 1000) -> Iterator[models.Response]:
+    """
+    Stream all responses for a specific survey without materializing the full result list.
+    
+    Args:
+        db: Database session
+        survey_id: ID of the survey
+        chunk: Number of rows fetched from the server per batch
+    
+    Yields:
+        Response objects, one at a time
+    """
+    query = db.query(models.Response).filter(
+        models.Response.survey_id == survey_id
+    ).order_by(models.Response.id)
+    for response in query.yield_per(chunk):
+        yield response
 
 
 def get_responses_by_agent(db: Session, agent_id: int, skip: int = 0, limit: int = 100) -> List[models.Response]:
@@ -477,7 +659,26 @@ def get_responses_by_agent(db: Session, agent_id: int, skip: int = 0, limit: int
     """
     return db.query(models.Response).filter(
         models.Response.agent_id == agent_id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(_clamp_limit(limit)).all()
+
+
+def iter_responses_by_agent(db: Session, agent_id: int, chunk: int = 1000) -> Iterator[models.Response]:
+    """
+    Stream all responses for a specific agent without materializing the full result list.
+    
+    Args:
+        db: Database session
+        agent_id: ID of the agent
+        chunk: Number of rows fetched from the server per batch
+    
+    Yields:
+        Response objects, one at a time
+    """
+    query = db.query(models.Response).filter(
+        models.Response.agent_id == agent_id
+    ).order_by(models.Response.id)
+    for response in query.yield_per(chunk):
+        yield response
 
 
 def get_responses_by_session(db: Session, session_id: int, skip: int = 0, limit: int = 100) -> List[models.Response]:
@@ -495,7 +696,45 @@ def get_responses_by_session(db: Session, session_id: int, skip: int = 0, limit:
     """
     return db.query(models.Response).filter(
         models.Response.session_id == session_id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(_clamp_limit(limit)).all()
+
+
+def iter_responses_by_session(db: Session, session_id: int, chunk: int = 1000) -> Iterator[models.Response]:
+    """
+    Stream all responses for a specific session without materializing the full result list.
+    
+    Args:
+        db: Database session
+        session_id: ID of the session
+        chunk: Number of rows fetched from the server per batch
+    
+    Yields:
+        Response objects, one at a time
+    """
+    query = db.query(models.Response).filter(
+        models.Response.session_id == session_id
+    ).order_by(models.Response.id)
+    for response in query.yield_per(chunk):
+        yield response
+
+
+def filter_responses_by_text(db: Session, pattern: str, skip: int = 0, limit: int = 100) -> List[models.Response]:
+    """
+    Filter responses by a case-insensitive ILIKE pattern on the response text.
+    
+    Args:
+        db: Database session
+        pattern: ILIKE pattern, e.g. '%climate%'; the trigram index is used for
+            patterns with at least 3 non-wildcard characters
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+    
+    Returns:
+        List of response objects whose text matches the pattern
+    """
+    return db.query(models.Response).filter(
+        models.Response.response.ilike(pattern)
+    ).offset(skip).limit(_clamp_limit(limit)).all()
 
 
 def get_responses_by_agent_characteristics(
@@ -519,7 +758,44 @@ def get_responses_by_agent_characteristics(
     
     Returns:
         List of response objects from agents matching the specified characteristics
+    
+    Raises:
+        ValueError: If a filter references an unknown characteristic
+    """
+    query = _responses_by_agent_characteristics_query(db, numerical_filters, categorical_filters)
+    return query.offset(skip).limit(_clamp_limit(limit)).all()
+
+
+def get_responses_page_by_agent_characteristics(
+    db: Session,
+    numerical_filters: Optional[List[Dict[str, Any]]] = None,
+    categorical_filters: Optional[List[Dict[str, Any]]] = None,
+    cursor: Optional[str] = None,
+    page_size: int = 100
+) -> Tuple[List[models.Response], Optional[str]]:
+    """
+    Retrieve responses based on agent characteristics with keyset (cursor) pagination.
+    
+    Args:
+        db: Database session
+        numerical_filters: Same format as get_responses_by_agent_characteristics
+        categorical_filters: Same format as get_responses_by_agent_characteristics
+        cursor: Cursor returned by the previous page, or None for the first page
+        page_size: Maximum number of records to return
+    
+    Returns:
+        Tuple of (list of response objects, cursor for the next page or None)
     """
+    query = _responses_by_agent_characteristics_query(db, numerical_filters, categorical_filters)
+    return _paginate(query, models.Response, cursor, page_size)
+
+
+def _responses_by_agent_characteristics_query(
+    db: Session,
+    numerical_filters: Optional[List[Dict[str, Any]]] = None,
+    categorical_filters: Optional[List[Dict[str, Any]]] = None
+):
+    """Build the Responses x Agents query shared by the list and page variants."""
     # Start with a base query joining responses with agents
     query = db.query(models.Response).join(models.Agent, models.Response.agent_id == models.Agent.id)
     
@@ -530,11 +806,7 @@ def get_responses_by_agent_characteristics(
             operator = filter_item.get('operator', '=')
             value = filter_item['value']
             
-            # Determine the appropriate cast type based on the value type
-            cast_type = Integer if isinstance(value, int) else Float
-            
-            # Extract the field value and cast it to the appropriate type
-            field_value = cast(func.jsonb_extract_path_text(models.Agent.numerical_characteristics, field), cast_type)
+            field_value = _numerical_field(field)
             
             # Apply the appropriate operator
             if operator == '>':
@@ -553,9 +825,6 @@ def get_responses_by_agent_characteristics(
         for filter_item in categorical_filters:
             field = filter_item['field']
             value = filter_item['value']
-            
-            # Use the JSONB containment operator @> for more efficient filtering with GIN index
-            filter_json = {field: value}
-            query = query.filter(models.Agent.categorical_characteristics.contains(filter_json))
+            query = query.filter(_categorical_clause(field, value))
     
-    return query.offset(skip).limit(limit).all() 
\ No newline at end of file
+    return query
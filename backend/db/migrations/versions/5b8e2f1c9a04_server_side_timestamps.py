@@ -0,0 +1,66 @@
+"""Generate timestamps server-side
+
+Revision ID: 5b8e2f1c9a04
+Revises: a7c4e91b2d53
+Create Date: 2025-03-11 09:41:05.662817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f1c9a04'
+down_revision: Union[str, None] = 'a7c4e91b2d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing naive values were written as UTC; convert them explicitly rather than
+    # letting the cast read them in the server's TimeZone
+    op.alter_column('demographics', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               type_=sa.DateTime(timezone=True),
+               postgresql_using="created_at AT TIME ZONE 'UTC'",
+               server_default=sa.text('now()'),
+               existing_nullable=True)
+    op.alter_column('surveys', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               type_=sa.DateTime(timezone=True),
+               postgresql_using="created_at AT TIME ZONE 'UTC'",
+               server_default=sa.text('now()'),
+               existing_nullable=True)
+    op.alter_column('sessions', 'started_at',
+               existing_type=postgresql.TIMESTAMP(),
+               type_=sa.DateTime(timezone=True),
+               postgresql_using="started_at AT TIME ZONE 'UTC'",
+               server_default=sa.text('now()'),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Store UTC wall-clock time again, matching what the naive columns held before
+    op.alter_column('sessions', 'started_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=postgresql.TIMESTAMP(),
+               postgresql_using="started_at AT TIME ZONE 'UTC'",
+               server_default=None,
+               existing_nullable=True)
+    op.alter_column('surveys', 'created_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=postgresql.TIMESTAMP(),
+               postgresql_using="created_at AT TIME ZONE 'UTC'",
+               server_default=None,
+               existing_nullable=True)
+    op.alter_column('demographics', 'created_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=postgresql.TIMESTAMP(),
+               postgresql_using="created_at AT TIME ZONE 'UTC'",
+               server_default=None,
+               existing_nullable=True)
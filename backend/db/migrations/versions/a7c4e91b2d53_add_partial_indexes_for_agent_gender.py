@@ -0,0 +1,30 @@
+"""Add partial indexes for agent gender
+
+Revision ID: a7c4e91b2d53
+Revises: d38ae2468719
+Create Date: 2025-03-10 14:12:37.218405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e91b2d53'
+down_revision: Union[str, None] = 'd38ae2468719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_agents_gender_female', 'agents', ['id'], unique=False, postgresql_where=sa.text('categorical_characteristics @> \'{"gender": "female"}\''))
+    op.create_index('ix_agents_gender_male', 'agents', ['id'], unique=False, postgresql_where=sa.text('categorical_characteristics @> \'{"gender": "male"}\''))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_agents_gender_male', table_name='agents')
+    op.drop_index('ix_agents_gender_female', table_name='agents')
@@ -0,0 +1,47 @@
+"""Add generated columns for hot agent characteristics
+
+Revision ID: c3d9a6e04f17
+Revises: 5b8e2f1c9a04
+Create Date: 2025-03-11 16:27:48.093152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9a6e04f17'
+down_revision: Union[str, None] = '5b8e2f1c9a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agents', sa.Column('age', sa.Float(), sa.Computed("(numerical_characteristics->>'age')::double precision"), nullable=True))
+    op.add_column('agents', sa.Column('income_level', sa.Float(), sa.Computed("(numerical_characteristics->>'income_level')::double precision"), nullable=True))
+    op.add_column('agents', sa.Column('gender', sa.Text(), sa.Computed("categorical_characteristics->>'gender'"), nullable=True))
+    op.add_column('agents', sa.Column('location', sa.Text(), sa.Computed("categorical_characteristics->>'location'"), nullable=True))
+    op.create_index(op.f('ix_agents_age'), 'agents', ['age'], unique=False)
+    op.create_index(op.f('ix_agents_income_level'), 'agents', ['income_level'], unique=False)
+    op.create_index(op.f('ix_agents_gender'), 'agents', ['gender'], unique=False)
+    op.create_index(op.f('ix_agents_location'), 'agents', ['location'], unique=False)
+    # Gender filters now go through ix_agents_gender, so the partial @> indexes are never used
+    op.drop_index('ix_agents_gender_male', table_name='agents')
+    op.drop_index('ix_agents_gender_female', table_name='agents')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_agents_gender_female', 'agents', ['id'], unique=False, postgresql_where=sa.text('categorical_characteristics @> \'{"gender": "female"}\''))
+    op.create_index('ix_agents_gender_male', 'agents', ['id'], unique=False, postgresql_where=sa.text('categorical_characteristics @> \'{"gender": "male"}\''))
+    op.drop_index(op.f('ix_agents_location'), table_name='agents')
+    op.drop_index(op.f('ix_agents_gender'), table_name='agents')
+    op.drop_index(op.f('ix_agents_income_level'), table_name='agents')
+    op.drop_index(op.f('ix_agents_age'), table_name='agents')
+    op.drop_column('agents', 'location')
+    op.drop_column('agents', 'gender')
+    op.drop_column('agents', 'income_level')
+    op.drop_column('agents', 'age')
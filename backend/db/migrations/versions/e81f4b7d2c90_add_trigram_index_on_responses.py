@@ -0,0 +1,29 @@
+"""Add trigram index on response text
+
+Revision ID: e81f4b7d2c90
+Revises: c3d9a6e04f17
+Create Date: 2025-03-12 10:08:19.540271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81f4b7d2c90'
+down_revision: Union[str, None] = 'c3d9a6e04f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_responses_response_trgm', 'responses', ['response'], unique=False, postgresql_using='gin', postgresql_ops={'response': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_responses_response_trgm', table_name='responses', postgresql_using='gin', postgresql_ops={'response': 'gin_trgm_ops'})
@@ -1,8 +1,7 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Text, CheckConstraint, Index
+from sqlalchemy import Column, Integer, Float, ForeignKey, String, DateTime, Text, CheckConstraint, Index, Computed, DDL, event, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from backend.db.database import Base
-import datetime
 
 class Demographics(Base):
     """
@@ -18,13 +17,16 @@ class Demographics(Base):
     numerical_characteristics = Column(JSONB, nullable=False)
     categorical_characteristics = Column(JSONB, nullable=False)
     num_agents = Column(Integer, nullable=False, default=100)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     __table_args__ = (
         Index('ix_demographics_numerical_characteristics', numerical_characteristics, postgresql_using='gin'),
         Index('ix_demographics_categorical_characteristics', categorical_characteristics, postgresql_using='gin'),
     )
     
+    # Fetch the server-generated timestamp in the INSERT ... RETURNING round-trip
+    __mapper_args__ = {"eager_defaults": True}
+    
     sessions = relationship("Session", back_populates="demographic")
 
 class Survey(Base):
@@ -38,7 +40,9 @@ class Survey(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __mapper_args__ = {"eager_defaults": True}
     
     questions = relationship("Question", back_populates="survey")
     sessions = relationship("Session", back_populates="survey")
@@ -81,7 +85,9 @@ class Session(Base):
     id = Column(Integer, primary_key=True, index=True)
     survey_id = Column(Integer, ForeignKey('surveys.id', ondelete='CASCADE'), nullable=False)
     demographic_id = Column(Integer, ForeignKey('demographics.id', ondelete='CASCADE'), nullable=False)
-    started_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __mapper_args__ = {"eager_defaults": True}
     
     survey = relationship("Survey", back_populates="sessions")
     demographic = relationship("Demographics", back_populates="sessions")
@@ -100,11 +106,20 @@ class Agent(Base):
     session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
     numerical_characteristics = Column(JSONB, nullable=False)
     categorical_characteristics = Column(JSONB, nullable=False)
+    
+    # Generated copies of the most frequently filtered keys. The JSONB documents stay
+    # canonical; these give the planner real statistics and plain B-tree range scans.
+    age = Column(Float, Computed("(numerical_characteristics->>'age')::double precision"), index=True)
+    income_level = Column(Float, Computed("(numerical_characteristics->>'income_level')::double precision"), index=True)
+    gender = Column(Text, Computed("categorical_characteristics->>'gender'"), index=True)
+    location = Column(Text, Computed("categorical_characteristics->>'location'"), index=True)
 
     __table_args__ = (
         Index('ix_agents_numerical_characteristics', numerical_characteristics, postgresql_using='gin'),
         Index('ix_agents_categorical_characteristics', categorical_characteristics, postgresql_using='gin'),
     )
+    
+    __mapper_args__ = {"eager_defaults": True}
 
     session = relationship("Session", back_populates="agents")
     responses = relationship("Response", back_populates="agent")
@@ -123,7 +138,20 @@ class Response(Base):
     question_id = Column(Integer, ForeignKey('questions.id', ondelete='CASCADE'), nullable=False)
     response = Column(Text, nullable=False)
     
+    __table_args__ = (
+        # Trigram index so substring (ILIKE '%...%') filters can use an index scan
+        Index('ix_responses_response_trgm', response, postgresql_using='gin',
+              postgresql_ops={'response': 'gin_trgm_ops'}),
+    )
+    
     session = relationship("Session", back_populates="responses")
     agent = relationship("Agent", back_populates="responses")
     survey = relationship("Survey", back_populates="responses")
-    question = relationship("Question", back_populates="responses") 
\ No newline at end of file
+    question = relationship("Question", back_populates="responses")
+
+# gin_trgm_ops is provided by pg_trgm, which must exist before the index is created
+event.listen(
+    Response.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+)
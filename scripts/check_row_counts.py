@@ -4,6 +4,7 @@ Script to directly check row counts in all tables.
 """
 import os
 import sys
+import argparse
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
@@ -24,8 +25,28 @@ DB_NAME = os.getenv("DB_NAME")
 # Construct the database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-def check_row_counts():
-    """Check row counts in all tables."""
+# Fixed-shape statements, built once at import time
+TABLE_NAMES_QUERY = text("""
+    SELECT table_name 
+    FROM information_schema.tables 
+    WHERE table_schema = 'public'
+    ORDER BY table_name;
+""")
+LIVE_TUPLES_QUERY = text("""
+    SELECT relname, n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = 'public'
+    ORDER BY relname;
+""")
+SELECT_ALEMBIC_VERSION = text("SELECT version_num FROM alembic_version")
+
+def check_row_counts(exact=False):
+    """
+    Check row counts in all tables.
+    
+    Args:
+        exact: Run COUNT(*) on every table instead of reading the statistics collector's estimate
+    """
     print(f"Checking row counts in database '{DB_NAME}'...")
     
     # Create engine
@@ -33,27 +54,31 @@ def check_row_counts():
     
     # Create a connection
     with engine.connect() as connection:
-        # Get all table names
-        query = text("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public'
-            ORDER BY table_name;
-        """)
-        result = connection.execute(query)
-        table_names = [row[0] for row in result]
+        if exact:
+            # Get all table names
+            result = connection.execute(TABLE_NAMES_QUERY)
+            table_names = [row[0] for row in result]
+            
+            # Count rows in every table with a single UNION ALL round-trip
+            counts = []
+            if table_names:
+                query = text(" UNION ALL ".join(
+                    f"SELECT '{table_name}' AS table_name, COUNT(*) AS row_count FROM \"{table_name}\""
+                    for table_name in table_names
+                ) + " ORDER BY table_name")
+                counts = connection.execute(query).fetchall()
+        else:
+            # Live-tuple estimates for every table in one O(1) catalog query
+            counts = connection.execute(LIVE_TUPLES_QUERY).fetchall()
+            table_names = [row[0] for row in counts]
         
-        # Check row counts for each table
         print("\n=== Row Counts ===")
-        for table_name in table_names:
-            query = text(f"SELECT COUNT(*) FROM \"{table_name}\"")
-            count = connection.execute(query).scalar()
+        for table_name, count in counts:
             print(f"Table: {table_name}, Row Count: {count}")
         
         # Check if alembic_version has a version
         if 'alembic_version' in table_names:
-            query = text("SELECT version_num FROM alembic_version")
-            result = connection.execute(query).fetchall()
+            result = connection.execute(SELECT_ALEMBIC_VERSION).fetchall()
             if result:
                 print("\n=== Alembic Version ===")
                 for row in result:
@@ -64,7 +89,11 @@ def check_row_counts():
 
 def main():
     """Check row counts in all tables."""
-    check_row_counts()
+    parser = argparse.ArgumentParser(description='Check row counts in all tables.')
+    parser.add_argument('--exact', action='store_true', help='Count rows exactly instead of using table statistics')
+    args = parser.parse_args()
+    
+    check_row_counts(exact=args.exact)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -4,8 +4,9 @@ Script to clean up the test database by truncating all tables.
 """
 import os
 import sys
+import argparse
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, inspect, MetaData, Table
+from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
@@ -27,6 +28,14 @@ DB_NAME = os.getenv("DB_NAME") + "_test"  # Test database name
 # Construct the database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
+# Ordinary tables in the public schema, read straight from the catalog in one query
+TABLE_NAMES_QUERY = text("""
+    SELECT c.relname
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind = 'r'
+""")
+
 def check_database_exists():
     """Check if the test database exists."""
     # Connect to PostgreSQL server
@@ -40,7 +49,7 @@ def check_database_exists():
     cursor = conn.cursor()
     
     # Check if database exists
-    cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{DB_NAME}'")
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (DB_NAME,))
     exists = cursor.fetchone() is not None
     
     cursor.close()
@@ -48,55 +57,50 @@ def check_database_exists():
     
     return exists
 
-def truncate_all_tables():
+def truncate_all_tables(connection):
     """Truncate all tables in the test database."""
     print(f"Truncating all tables in test database '{DB_NAME}'...")
     
-    # Create engine
-    engine = create_engine(DATABASE_URL)
-    
     # Get all table names
-    inspector = inspect(engine)
-    table_names = inspector.get_table_names()
+    table_names = [row[0] for row in connection.execute(TABLE_NAMES_QUERY)]
     
     if not table_names:
         print(f"No tables found in test database '{DB_NAME}'.")
         return
     
-    # Create a connection
-    with engine.connect() as connection:
-        # Start a transaction
-        with connection.begin():
-            # Disable foreign key constraints
-            connection.execute(text("SET CONSTRAINTS ALL DEFERRED"))
-            
-            # Truncate all tables
-            for table_name in table_names:
-                print(f"  Truncating table '{table_name}'...")
-                connection.execute(text(f'TRUNCATE TABLE "{table_name}" CASCADE'))
-            
-            # Enable foreign key constraints
-            connection.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+    for table_name in table_names:
+        print(f"  Truncating table '{table_name}'...")
+    
+    # Truncate every table in one statement so CASCADE is resolved and locks are taken once
+    quoted = ", ".join(f'"{table_name}"' for table_name in table_names)
+    connection.execute(text(f"TRUNCATE TABLE {quoted} RESTART IDENTITY CASCADE"))
     
     print(f"All tables in test database '{DB_NAME}' have been truncated.")
 
 def main():
     """Clean up the test database by truncating all tables."""
+    parser = argparse.ArgumentParser(description='Clean up the test database by truncating all tables.')
+    parser.add_argument('-y', '--yes', action='store_true', help='Skip the confirmation prompt (for CI and scripted runs)')
+    args = parser.parse_args()
+    
     print("=== Test Database Cleanup Script ===")
     
     # Confirm with the user
-    confirm = input(f"This will delete all data in the test database '{DB_NAME}'. Are you sure? (y/n): ")
-    if confirm.lower() != 'y':
-        print("Operation cancelled.")
-        return
+    if not args.yes:
+        confirm = input(f"This will delete all data in the test database '{DB_NAME}'. Are you sure? (y/n): ")
+        if confirm.lower() != 'y':
+            print("Operation cancelled.")
+            return
     
     # Check if the test database exists
     if not check_database_exists():
         print(f"Test database '{DB_NAME}' does not exist.")
         return
     
-    # Truncate all tables
-    truncate_all_tables()
+    # Truncate all tables using a single connection and transaction
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as connection:
+        truncate_all_tables(connection)
     
     print("\n=== Test Database Cleanup Complete ===")
 
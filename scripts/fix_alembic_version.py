@@ -4,6 +4,7 @@ Script to fix the alembic_version table.
 """
 import os
 import sys
+import argparse
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
@@ -27,6 +28,17 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 # The latest migration version
 LATEST_MIGRATION_VERSION = "ef0a3513fc9e"  # This is the second migration
 
+# Statements reused on every run, built once at import time
+CREATE_ALEMBIC_VERSION = text("""
+    CREATE TABLE IF NOT EXISTS alembic_version (
+        version_num VARCHAR(32) NOT NULL, 
+        PRIMARY KEY (version_num)
+    )
+""")
+DELETE_ALEMBIC_VERSION = text("DELETE FROM alembic_version")
+INSERT_ALEMBIC_VERSION = text("INSERT INTO alembic_version (version_num) VALUES (:version)")
+SELECT_ALEMBIC_VERSION = text("SELECT version_num FROM alembic_version")
+
 def fix_alembic_version():
     """Fix the alembic_version table."""
     print(f"Fixing alembic_version table in database '{DB_NAME}'...")
@@ -34,70 +46,34 @@ def fix_alembic_version():
     # Create engine
     engine = create_engine(DATABASE_URL)
     
-    # Check if alembic_version table exists
-    with engine.connect() as connection:
-        query = text("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = 'alembic_version'
-            )
-        """)
-        table_exists = connection.execute(query).scalar()
-    
-    # Create table if it doesn't exist
-    if not table_exists:
-        print("Creating alembic_version table...")
-        with engine.connect() as connection:
-            with connection.begin():
-                connection.execute(text("""
-                    CREATE TABLE alembic_version (
-                        version_num VARCHAR(32) NOT NULL, 
-                        PRIMARY KEY (version_num)
-                    )
-                """))
-    
-    # Check if there's a version in the table
-    with engine.connect() as connection:
-        query = text("SELECT COUNT(*) FROM alembic_version")
-        count = connection.execute(query).scalar()
-    
-    # Insert or update the version
-    if count == 0:
-        # Insert the latest migration version
-        print(f"Inserting latest migration version: {LATEST_MIGRATION_VERSION}")
-        with engine.connect() as connection:
-            with connection.begin():
-                connection.execute(
-                    text("INSERT INTO alembic_version (version_num) VALUES (:version)"),
-                    {"version": LATEST_MIGRATION_VERSION}
-                )
-    else:
-        # Update the version to the latest
-        print(f"Updating to latest migration version: {LATEST_MIGRATION_VERSION}")
-        with engine.connect() as connection:
-            with connection.begin():
-                connection.execute(text("DELETE FROM alembic_version"))
-                connection.execute(
-                    text("INSERT INTO alembic_version (version_num) VALUES (:version)"),
-                    {"version": LATEST_MIGRATION_VERSION}
-                )
-    
-    # Verify the version
-    with engine.connect() as connection:
-        query = text("SELECT version_num FROM alembic_version")
-        version = connection.execute(query).scalar()
+    # Do everything in one connection and transaction
+    with engine.begin() as connection:
+        # Create the table if it doesn't exist, without a separate existence check
+        connection.execute(CREATE_ALEMBIC_VERSION)
+        
+        # Replace whatever version is recorded with the latest one
+        print(f"Setting latest migration version: {LATEST_MIGRATION_VERSION}")
+        connection.execute(DELETE_ALEMBIC_VERSION)
+        connection.execute(INSERT_ALEMBIC_VERSION, {"version": LATEST_MIGRATION_VERSION})
+        
+        # Verify the version
+        version = connection.execute(SELECT_ALEMBIC_VERSION).scalar()
         print(f"Current migration version: {version}")
 
 def main():
     """Fix the alembic_version table."""
+    parser = argparse.ArgumentParser(description='Fix the alembic_version table.')
+    parser.add_argument('-y', '--yes', action='store_true', help='Skip the confirmation prompt (for CI and scripted runs)')
+    args = parser.parse_args()
+    
     print("=== Alembic Version Fix Script ===")
     
     # Confirm with the user
-    confirm = input(f"This will update the alembic_version table in the '{DB_NAME}' database. Are you sure? (y/n): ")
-    if confirm.lower() != 'y':
-        print("Operation cancelled.")
-        return
+    if not args.yes:
+        confirm = input(f"This will update the alembic_version table in the '{DB_NAME}' database. Are you sure? (y/n): ")
+        if confirm.lower() != 'y':
+            print("Operation cancelled.")
+            return
     
     # Fix alembic_version
     fix_alembic_version()
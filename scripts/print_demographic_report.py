@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Script to print the example demographic distribution, statistics for agents
+generated from it, and how they compare with the population summary.
+
+Also writes the agents to generated_agents.csv.
+"""
+import os
+import sys
+import numpy as np
+
+# Add the parent directory to sys.path to allow importing from the project
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from backend.core.agent_analysis import (
+    NUMERICAL_COLUMNS,
+    CATEGORICAL_DOMAINS,
+    create_example_demographic,
+    generate_seeded_agents,
+    save_agents_to_csv,
+    analyze_agents,
+    compare_with_summary
+)
+
+# Display labels for the reported categories, computed once
+DISPLAY_LABELS = {
+    key: key.replace('_', ' ').title()
+    for key in (*CATEGORICAL_DOMAINS, *NUMERICAL_COLUMNS)
+}
+
+def print_demographic_and_summary_statistics():
+    """Print the demographic distribution and summary statistics for the generated agents"""
+    # Collect the whole report and write it once
+    lines = []
+    
+    # Create a demographic distribution
+    demographic = create_example_demographic()
+    
+    # Generate agents
+    num_agents = 500
+    agents = generate_seeded_agents(demographic, num_agents)
+    
+    # Save agents to CSV
+    csv_path = "generated_agents.csv"
+    save_agents_to_csv(agents, csv_path)
+    
+    # Analyze the agents
+    agents_stats = analyze_agents(agents)
+    
+    # Compare with the summary
+    comparison = compare_with_summary(agents_stats, demographic, num_agents)
+    
+    # Print the demographic distribution
+    lines.append("\n=== DEMOGRAPHIC DISTRIBUTION ===\n")
+    
+    # Print numerical distributions
+    lines.append("--- Numerical Distributions ---\n")
+    
+    lines.append("Age Distribution:")
+    for point in demographic.numerical.age.points:
+        lines.append(f"  {point.value}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Income Distribution:")
+    for point in demographic.numerical.income_level.points:
+        lines.append(f"  ${point.value:,.0f}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Education Years Distribution:")
+    for point in demographic.numerical.years_of_education.points:
+        lines.append(f"  {point.value} years: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Religiosity Distribution:")
+    for point in demographic.numerical.religiosity.points:
+        lines.append(f"  {point.value}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Political Economic Distribution:")
+    for point in demographic.numerical.political_affiliation.economic.points:
+        lines.append(f"  {point.value}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Political Governance Distribution:")
+    for point in demographic.numerical.political_affiliation.governance.points:
+        lines.append(f"  {point.value}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Political Cultural Distribution:")
+    for point in demographic.numerical.political_affiliation.cultural.points:
+        lines.append(f"  {point.value}: {point.probability * 100:.1f}%")
+    lines.append("")
+    
+    # Print categorical distributions
+    lines.append("--- Categorical Distributions ---\n")
+    
+    lines.append("Race/Ethnicity Distribution:")
+    for cat in demographic.categorical.race_ethnicity:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Gender Distribution:")
+    for cat in demographic.categorical.gender:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Religion Distribution:")
+    for cat in demographic.categorical.religion:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Urbanization Distribution:")
+    for cat in demographic.categorical.urbanization:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Education Style Distribution:")
+    for cat in demographic.categorical.education_style:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    lines.append("Employment Style Distribution:")
+    for cat in demographic.categorical.employment_style:
+        lines.append(f"  {cat.category}: {cat.probability * 100:.1f}%")
+    lines.append("")
+    
+    # Print summary profiles
+    lines.append("\n=== SUMMARY PROFILES ===\n")
+    
+    for profile in comparison["summary_profiles"]:
+        lines.append(f"Profile: {profile['name']}")
+        lines.append(f"  Count: {profile['count']} ({profile['percentage']:.1f}%)")
+        lines.append("")
+    
+    # Print agent statistics
+    lines.append("\n=== AGENT STATISTICS ===\n")
+    
+    # Print categorical distributions
+    lines.append("--- Categorical Distributions ---\n")
+    for category, counts in agents_stats["categorical_counts"].items():
+        lines.append(f"{DISPLAY_LABELS[category]}:")
+        subcats = list(counts.keys())
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        total = values.sum()
+        # Stable sort on the negated counts keeps ties in insertion order, like sorted(reverse=True)
+        for i in np.argsort(-values, kind="stable"):
+            percentage = (values[i] / total) * 100
+            lines.append(f"  {subcats[i]}: {values[i]} ({percentage:.1f}%)")
+        lines.append("")
+    
+    # Print numerical statistics
+    lines.append("--- Numerical Statistics ---\n")
+    for category, stats in agents_stats["numerical_stats"].items():
+        lines.append(f"{DISPLAY_LABELS[category]}:")
+        lines.append(f"  Mean: {stats['mean']:.2f}")
+        lines.append(f"  Range: {stats['min']} to {stats['max']}")
+        lines.append(f"  Percentiles: 25th={stats['percentiles']['25th']:.2f}, " +
+              f"50th={stats['percentiles']['50th']:.2f}, " +
+              f"75th={stats['percentiles']['75th']:.2f}")
+        lines.append("")
+    
+    # Print comparison with summary
+    lines.append("\n=== COMPARISON WITH POPULATION SUMMARY ===\n")
+    
+    # Print categorical comparison
+    lines.append("--- Categorical Comparison ---\n")
+    for category, data in comparison["categorical_comparison"].items():
+        lines.append(f"{DISPLAY_LABELS[category]}:")
+        lines.append("  Expected vs Actual (Difference):")
+        
+        # Get all subcategories
+        all_subcats = sorted(set(data["expected"].keys()) | set(data["actual"].keys()))
+        
+        for subcat in all_subcats:
+            expected = data["expected"].get(subcat, 0)
+            actual = data["actual"].get(subcat, 0)
+            diff = data["differences"].get(subcat, 0)
+            
+            lines.append(f"  {subcat}: {expected} vs {actual} ({diff:+d})")
+        lines.append("")
+    
+    # Print numerical comparison
+    lines.append("--- Numerical Comparison ---\n")
+    for category, data in comparison["numerical_comparison"].items():
+        lines.append(f"{DISPLAY_LABELS[category]}:")
+        if data["expected_mean"] is not None:
+            lines.append(f"  Expected Mean: {data['expected_mean']:.2f}")
+        lines.append(f"  Actual Mean: {data['actual_mean']:.2f}")
+        lines.append(f"  Actual Range: {data['actual_min']} to {data['actual_max']}")
+        lines.append(f"  Actual Percentiles: 25th={data['actual_percentiles']['25th']:.2f}, " +
+              f"50th={data['actual_percentiles']['50th']:.2f}, " +
+              f"75th={data['actual_percentiles']['75th']:.2f}")
+        lines.append("")
+    
+    lines.append(f"\nAgents have been saved to {csv_path}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+
+if __name__ == "__main__":
+    print_demographic_and_summary_statistics()
@@ -4,8 +4,9 @@ Script to reset the database by truncating all tables except alembic_version.
 """
 import os
 import sys
+import argparse
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, inspect, MetaData, Table
+from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 
 # Add the parent directory to sys.path to allow importing from the project
@@ -25,61 +26,66 @@ DB_NAME = os.getenv("DB_NAME")
 # Construct the database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-def truncate_all_tables():
+# Look up and truncate every public table except alembic_version entirely server-side,
+# so the reset is one round-trip regardless of the number of tables
+TRUNCATE_ALL_TABLES = text("""
+    DO $$
+    DECLARE
+        tbls text;
+    BEGIN
+        SELECT string_agg(format('%I', c.relname), ', ') INTO tbls
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname <> 'alembic_version';
+        
+        IF tbls IS NOT NULL THEN
+            EXECUTE 'TRUNCATE TABLE ' || tbls || ' RESTART IDENTITY CASCADE';
+        END IF;
+    END $$;
+""")
+
+SELECT_ALEMBIC_VERSION = text("SELECT version_num FROM alembic_version")
+
+def truncate_all_tables(connection):
     """Truncate all tables in the database except alembic_version."""
     print(f"Truncating all tables in database '{DB_NAME}'...")
     
-    # Create engine
-    engine = create_engine(DATABASE_URL)
-    
-    # Get all table names
-    inspector = inspect(engine)
-    table_names = inspector.get_table_names()
-    
-    # Create a connection
-    with engine.connect() as connection:
-        # Start a transaction
-        with connection.begin():
-            # Disable foreign key constraints
-            connection.execute(text("SET CONSTRAINTS ALL DEFERRED"))
-            
-            # Truncate all tables except alembic_version
-            for table_name in table_names:
-                if table_name != 'alembic_version':
-                    print(f"  Truncating table '{table_name}'...")
-                    connection.execute(text(f'TRUNCATE TABLE "{table_name}" CASCADE'))
-                else:
-                    print(f"  Skipping table '{table_name}' (preserving migration history)")
-            
-            # Enable foreign key constraints
-            connection.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+    # Preserve alembic_version (migration history); everything else is emptied
+    connection.execute(TRUNCATE_ALL_TABLES)
     
     print(f"All tables in database '{DB_NAME}' have been truncated (except alembic_version).")
-    
-    # Check if alembic_version has a version
-    with engine.connect() as connection:
-        query = text("SELECT COUNT(*) FROM alembic_version")
-        count = connection.execute(query).scalar()
-        
-        if count == 0:
-            print("\nWarning: alembic_version table is empty. Run scripts/fix_alembic_version.py to fix it.")
-        else:
-            query = text("SELECT version_num FROM alembic_version")
-            version = connection.execute(query).scalar()
-            print(f"\nCurrent migration version: {version}")
+
+def report_alembic_version(connection):
+    """Print the current migration version, warning if alembic_version is empty."""
+    version = connection.execute(SELECT_ALEMBIC_VERSION).scalar()
+    if version is None:
+        print("\nWarning: alembic_version table is empty. Run scripts/fix_alembic_version.py to fix it.")
+    else:
+        print(f"\nCurrent migration version: {version}")
 
 def main():
     """Reset the database by truncating all tables except alembic_version."""
+    parser = argparse.ArgumentParser(description='Reset the database by truncating all tables except alembic_version.')
+    parser.add_argument('-y', '--yes', action='store_true', help='Skip the confirmation prompt (for CI and scripted runs)')
+    args = parser.parse_args()
+    
     print("=== Database Reset Script ===")
     
     # Confirm with the user
-    confirm = input(f"This will delete all data in the '{DB_NAME}' database (except migration history). Are you sure? (y/n): ")
-    if confirm.lower() != 'y':
-        print("Operation cancelled.")
-        return
+    if not args.yes:
+        confirm = input(f"This will delete all data in the '{DB_NAME}' database (except migration history). Are you sure? (y/n): ")
+        if confirm.lower() != 'y':
+            print("Operation cancelled.")
+            return
     
-    # Truncate all tables
-    truncate_all_tables()
+    # Use a single connection and transaction for the whole reset
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as connection:
+        # Truncate all tables
+        truncate_all_tables(connection)
+        
+        # Check if alembic_version has a version
+        report_alembic_version(connection)
     
     print("\n=== Database Reset Complete ===")
     print("The database has been reset and is ready for use.")
@@ -3,12 +3,16 @@ Configuration file for pytest.
 """
 import os
 import sys
+import hashlib
 import pytest
+from functools import lru_cache
 from dotenv import load_dotenv
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable, CreateIndex
 
 # Add the parent directory to sys.path to allow importing from the project
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -18,94 +22,308 @@ if parent_dir not in sys.path:
 # Load environment variables
 load_dotenv()
 
+from backend.db.models import Base
+
 # Get database credentials from environment variables
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME") + "_test"  # Use a separate test database
+# One test database for the whole run, shared by all pytest-xdist workers; tests
+# are isolated by rolling back their transactions, not by separate databases
+DB_NAME = os.getenv("DB_NAME") + "_test"
 
 # Construct the database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-def create_test_database():
-    """Create test database if it doesn't exist."""
-    # Connect to PostgreSQL server
-    conn = psycopg2.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        database="postgres"
-    )
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    cursor = conn.cursor()
+def schema_version(metadata):
+    """Hash the PostgreSQL DDL of every table and index, so any model change gives a new version."""
+    dialect = postgresql.dialect()
+    ddl = []
+    for table in metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in sorted(table.indexes, key=lambda i: i.name))
+    return hashlib.md5("\n".join(ddl).encode()).hexdigest()[:12]
+
+SCHEMA_VERSION = schema_version(Base.metadata)
+
+# Template holding the schema, kept between runs; the test database is cloned from it.
+# Its name carries the schema version, so a stale template is never reused
+TEMPLATE_PREFIX = f"{DB_NAME}_template_"
+TEMPLATE_DB_NAME = f"{TEMPLATE_PREFIX}{SCHEMA_VERSION}"
+# The template is built under this name and renamed once its schema is complete
+TEMPLATE_BUILD_DB_NAME = f"{TEMPLATE_DB_NAME}_build"
+TEMPLATE_BUILD_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{TEMPLATE_BUILD_DB_NAME}"
+
+# Maintenance connection to the server's default database for CREATE/DROP DATABASE,
+# which can't run inside a transaction block
+ADMIN_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/postgres"
+admin_engine = create_engine(ADMIN_DATABASE_URL, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+
+DATABASE_EXISTS_QUERY = text("SELECT 1 FROM pg_database WHERE datname = :name")
+# The test database's comment records the schema version it was cloned from
+DATABASE_SCHEMA_VERSION_QUERY = text(
+    "SELECT shobj_description(oid, 'pg_database') AS schema_version FROM pg_database WHERE datname = :name"
+)
+# Exact prefix match rather than LIKE, where the underscores in the name would be wildcards
+STALE_TEMPLATES_QUERY = text(
+    "SELECT datname FROM pg_database WHERE left(datname, length(:prefix)) = :prefix AND datname <> :name"
+)
+TERMINATE_CONNECTIONS_QUERY = text(
+    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+    "WHERE datname = :name AND pid <> pg_backend_pid()"
+)
+
+# Advisory lock keys. The setup lock serializes creating and dropping the test
+# database across concurrent runs and xdist workers; every process using the
+# database holds the in-use lock shared, so a drop can tell whether another run
+# still needs it
+SETUP_LOCK_KEY = f"{DB_NAME}:setup"
+IN_USE_LOCK_KEY = f"{DB_NAME}:in-use"
+LOCK_QUERY = text("SELECT pg_advisory_lock(hashtext(:key))")
+TRY_LOCK_QUERY = text("SELECT pg_try_advisory_lock(hashtext(:key))")
+LOCK_SHARED_QUERY = text("SELECT pg_advisory_lock_shared(hashtext(:key))")
+UNLOCK_QUERY = text("SELECT pg_advisory_unlock(hashtext(:key))")
+UNLOCK_ALL_QUERY = text("SELECT pg_advisory_unlock_all()")
+
+@lru_cache(maxsize=1)
+def admin_connection():
+    """Open the maintenance connection on first use and reuse it for the rest of the session."""
+    return admin_engine.connect()
+
+def quote_identifier(name):
+    """Quote a database or table name for DDL, which can't take bind parameters."""
+    return admin_engine.dialect.identifier_preparer.quote_identifier(name)
+
+def create_template_database(connection):
+    """Create the template database and its schema if it doesn't exist, dropping older versions."""
+    if connection.execute(DATABASE_EXISTS_QUERY, {"name": TEMPLATE_DB_NAME}).first():
+        return
     
-    # Check if database exists
-    cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{DB_NAME}'")
-    if not cursor.fetchone():
-        # Create database
-        cursor.execute(f'CREATE DATABASE "{DB_NAME}"')
-        print(f"Created test database '{DB_NAME}'")
-    else:
-        print(f"Test database '{DB_NAME}' already exists")
+    # Templates for earlier schema versions will never be cloned again, and a
+    # leftover build of this one was interrupted before it completed
+    stale = connection.execute(STALE_TEMPLATES_QUERY, {"prefix": TEMPLATE_PREFIX, "name": TEMPLATE_DB_NAME})
+    for (name,) in stale.fetchall():
+        connection.execute(text(f"DROP DATABASE IF EXISTS {quote_identifier(name)}"))
     
-    cursor.close()
-    conn.close()
+    # Build under a temporary name so a failed build (e.g. no privilege for CREATE
+    # EXTENSION pg_trgm) never leaves a half-built template under the versioned name
+    connection.execute(text(f"CREATE DATABASE {quote_identifier(TEMPLATE_BUILD_DB_NAME)}"))
+    try:
+        # No pool for this one-off engine: CREATE DATABASE ... TEMPLATE fails while the
+        # template has connections, so none may be left checked in
+        engine = create_engine(TEMPLATE_BUILD_DATABASE_URL, poolclass=NullPool)
+        try:
+            Base.metadata.create_all(engine)
+        finally:
+            engine.dispose()
+    except Exception:
+        connection.execute(text(f"DROP DATABASE IF EXISTS {quote_identifier(TEMPLATE_BUILD_DB_NAME)}"))
+        raise
+    connection.execute(text(
+        f"ALTER DATABASE {quote_identifier(TEMPLATE_BUILD_DB_NAME)} RENAME TO {quote_identifier(TEMPLATE_DB_NAME)}"
+    ))
+    print(f"Created template database '{TEMPLATE_DB_NAME}'")
 
-def drop_test_database():
-    """Drop test database."""
-    # Connect to PostgreSQL server
-    conn = psycopg2.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        database="postgres"
-    )
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    cursor = conn.cursor()
+def create_test_database():
+    """Create test database from the template unless one with the current schema exists, and claim it for this process."""
+    connection = admin_connection()
     
-    # Terminate all connections to the test database
-    cursor.execute(f"""
-        SELECT pg_terminate_backend(pg_stat_activity.pid)
-        FROM pg_stat_activity
-        WHERE pg_stat_activity.datname = '{DB_NAME}'
-        AND pid <> pg_backend_pid()
-    """)
+    # Check and create under the lock, so concurrent runs can't both find the
+    # database missing and both try to create it
+    connection.execute(LOCK_QUERY, {"key": SETUP_LOCK_KEY})
+    try:
+        existing = connection.execute(DATABASE_SCHEMA_VERSION_QUERY, {"name": DB_NAME}).first()
+        if existing is not None and existing.schema_version == SCHEMA_VERSION:
+            print(f"Test database '{DB_NAME}' already exists")
+        else:
+            # Left behind by a run against an older schema
+            if existing is not None and not drop_unused_test_database(connection):
+                raise RuntimeError(f"Test database '{DB_NAME}' has an older schema but another run is still using it")
+            
+            # Clone the template, which is a file copy rather than replaying the DDL
+            create_template_database(connection)
+            connection.execute(text(
+                f"CREATE DATABASE {quote_identifier(DB_NAME)} TEMPLATE {quote_identifier(TEMPLATE_DB_NAME)}"
+            ))
+            connection.execute(text(f"COMMENT ON DATABASE {quote_identifier(DB_NAME)} IS '{SCHEMA_VERSION}'"))
+            print(f"Created test database '{DB_NAME}'")
+        
+        # Held until this process's admin connection closes, so no other run drops the database meanwhile
+        connection.execute(LOCK_SHARED_QUERY, {"key": IN_USE_LOCK_KEY})
+    finally:
+        connection.execute(UNLOCK_QUERY, {"key": SETUP_LOCK_KEY})
+
+def drop_unused_test_database(connection):
+    """Drop test database if no other process has claimed it, returning whether it was dropped.
     
-    # Drop database
-    cursor.execute(f'DROP DATABASE IF EXISTS "{DB_NAME}"')
+    Must be called with the setup lock held. Holding the in-use lock exclusively
+    proves no other run has claimed the database, so any connections left on it
+    (a psql session, the app's own engine) can safely be closed.
+    """
+    if not connection.execute(TRY_LOCK_QUERY, {"key": IN_USE_LOCK_KEY}).scalar():
+        return False
+    try:
+        if connection.dialect.server_version_info >= (13,):
+            # FORCE terminates any remaining connections server-side, so the drop
+            # is a single round-trip
+            connection.execute(text(f"DROP DATABASE IF EXISTS {quote_identifier(DB_NAME)} WITH (FORCE)"))
+        else:
+            # Older servers need the connections terminated first; DROP DATABASE
+            # can't share a multi-statement (implicitly transactional) query with it
+            connection.execute(TERMINATE_CONNECTIONS_QUERY, {"name": DB_NAME})
+            connection.execute(text(f"DROP DATABASE IF EXISTS {quote_identifier(DB_NAME)}"))
+    finally:
+        connection.execute(UNLOCK_QUERY, {"key": IN_USE_LOCK_KEY})
     print(f"Dropped test database '{DB_NAME}'")
-    
-    cursor.close()
-    conn.close()
+    return True
 
-@pytest.fixture(scope="session", autouse=True)
-def setup_test_database():
-    """Create test database before tests and drop it after."""
-    create_test_database()
-    yield
-    drop_test_database()
+def drop_test_database():
+    """Drop test database unless another run is still using it, keeping the template for the next session."""
+    connection = admin_connection()
+    # Give up this process's own claim first; the admin connection holds no other advisory locks
+    connection.execute(UNLOCK_ALL_QUERY)
+    connection.execute(LOCK_QUERY, {"key": SETUP_LOCK_KEY})
+    try:
+        if not drop_unused_test_database(connection):
+            print(f"Test database '{DB_NAME}' is still in use by another run; leaving it in place")
+    except OperationalError as exc:
+        # Don't turn a green run into an INTERNALERROR over cleanup
+        print(f"Could not drop test database '{DB_NAME}'; leaving it in place: {exc}")
+    finally:
+        connection.execute(UNLOCK_QUERY, {"key": SETUP_LOCK_KEY})
+
+# Set once this session has used the test database, so the controlling process knows to drop it
+USED_TEST_DATABASE = pytest.StashKey[bool]()
+
+def pytest_addoption(parser):
+    """Add the option to keep the test database between runs."""
+    parser.addoption(
+        "--keep-db",
+        action="store_true",
+        help="Keep the test database after the run so the next run reuses it instead of cloning a new one"
+    )
+
+def pytest_configure(config):
+    """Register the marker for tests that need the PostgreSQL test database."""
+    config.addinivalue_line("markers", "postgres: needs the PostgreSQL test database")
+
+def pytest_collection_modifyitems(items):
+    """Mark every test that (indirectly) uses the test engine as a postgres test."""
+    for item in items:
+        if "test_engine" in item.fixturenames:
+            item.add_marker(pytest.mark.postgres)
+
+def is_xdist_worker(config):
+    """Whether this process is a pytest-xdist worker rather than the controlling process."""
+    return hasattr(config, "workerinput")
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Record on the controlling process that an xdist worker used the test database."""
+    if getattr(node, "workeroutput", {}).get("used_test_database"):
+        node.config.stash[USED_TEST_DATABASE] = True
+
+def pytest_sessionfinish(session, exitstatus):
+    """Drop the test database once every worker has finished, unless --keep-db was given or nothing used it."""
+    config = session.config
+    # Workers leave the drop to the controlling process, as other workers may still be running
+    if not is_xdist_worker(config) and config.stash.get(USED_TEST_DATABASE, False):
+        # Tests never commit, so a kept database is still empty for the next run
+        if not config.getoption("--keep-db"):
+            drop_test_database()
+    if admin_connection.cache_info().currsize:
+        admin_connection().close()
+        admin_connection.cache_clear()
 
 @pytest.fixture(scope="session")
-def test_engine():
-    """Create a test engine connected to the test database."""
-    engine = create_engine(DATABASE_URL)
+def test_engine(request):
+    """Create a test engine connected to the test database, creating the database on first use."""
+    # Created here rather than at session start, so runs that select no database
+    # tests never contact the server
+    create_test_database()
+    # Each xdist worker gets here, and only the first creates the database; the
+    # controlling process drops it once they are all done
+    if is_xdist_worker(request.config):
+        request.config.workeroutput["used_test_database"] = True
+    else:
+        request.config.stash[USED_TEST_DATABASE] = True
+    
+    # LIFO keeps reusing the same warm connection across tests
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=5,
+        max_overflow=5,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        pool_recycle=3600
+    )
     yield engine
     engine.dispose()
 
-@pytest.fixture
-def db(test_engine):
-    """Create a fresh database session for each test."""
-    from backend.db.models import Base
+@pytest.fixture(scope="session")
+def test_session_factory(test_engine):
+    """Create the session factory once for the whole test session."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+def _rolled_back_session(test_engine, test_session_factory):
+    """Yield a session inside a transaction that is rolled back once the owning fixture goes out of scope.
+    
+    Nothing is ever committed to the shared database, so xdist workers can run
+    tests against it concurrently on their own connections. The session works
+    inside a SAVEPOINT that is reopened whenever it ends, so code under test
+    can commit or roll back as usual without touching the outer transaction.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
     
-    # Create tables
-    Base.metadata.create_all(test_engine)
+    # Reuse the session-wide factory, bound to this connection
+    session = test_session_factory(bind=connection)
+    session.begin_nested()
+    
+    @event.listens_for(session, "after_transaction_end")
+    def restart_savepoint(session, ended):
+        if ended.nested and not ended._parent.nested:
+            session.begin_nested()
     
-    # Create session
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    session = SessionLocal()
     try:
         yield session
     finally:
         session.close()
-        # Drop all tables after the test
-        Base.metadata.drop_all(test_engine) 
\ No newline at end of file
+        # Discard everything the test (or module) wrote
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture
+def db(test_engine, test_session_factory):
+    """Create a fresh database session for each test."""
+    yield from _rolled_back_session(test_engine, test_session_factory)
+
+@pytest.fixture(scope="module")
+def module_db(test_engine, test_session_factory):
+    """Create a database session shared by all tests in a module, for module-scoped fixtures."""
+    yield from _rolled_back_session(test_engine, test_session_factory)
+
+SAMPLE_RUN_AGENTS = 500
+
+@pytest.fixture(scope="session")
+def sample_run():
+    """Generate, analyze and compare one example population, shared by the whole test session.
+    
+    Returns a (demographic, columns, stats, comparison) tuple. The columns are
+    the seeded per-agent population in generate_agents_batch layout, so every
+    later step runs on the structure-of-arrays paths.
+    """
+    # Imported here so runs that never use the sample population skip loading the generator
+    from backend.core.agent_analysis import (
+        create_example_demographic,
+        generate_seeded_agents,
+        agents_to_batch,
+        analyze_agents_soa,
+        compare_with_summary
+    )
+    
+    demographic = create_example_demographic()
+    cols = agents_to_batch(generate_seeded_agents(demographic, SAMPLE_RUN_AGENTS))
+    stats = analyze_agents_soa(cols)
+    comparison = compare_with_summary(stats, demographic, SAMPLE_RUN_AGENTS)
+    return demographic, cols, stats, comparison
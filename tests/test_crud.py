@@ -1,17 +1,5 @@
-import sys
-import os
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from dotenv import load_dotenv
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
-# Add the parent directory to the path so we can import the modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from backend.db.database import Base
 from backend.db import models
 from backend.db import crud
 from backend.core.schemas import (
@@ -19,286 +7,155 @@ from backend.core.schemas import (
     DemographicsCreate, SessionCreate, ResponseCreate
 )
 
-# Load environment variables from .env file
-load_dotenv()
+@pytest.fixture
+def db_session(db):
+    """Create a database session whose changes are rolled back after each test."""
+    return db
 
-# Use PostgreSQL for testing
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME") + "_test"  # Use a separate test database
+# Validated once at import; tests fill in the parent IDs with copy(update=...),
+# which skips validation. Placeholder IDs are 0.
+SURVEY_DATA = SurveyCreate(
+    name="Test Survey",
+    description="A test survey"
+)
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+DEMOGRAPHIC_DATA = DemographicsCreate(
+    name="Test Demographic",
+    numerical_characteristics={"age_min": 18, "age_max": 65},
+    categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
+)
 
-def create_test_database():
-    """Create test database if it doesn't exist."""
-    # Connect to PostgreSQL server
-    conn = psycopg2.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        database="postgres"
-    )
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    cursor = conn.cursor()
-    
-    # Check if database exists
-    cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{DB_NAME}'")
-    if not cursor.fetchone():
-        # Create database
-        cursor.execute(f'CREATE DATABASE "{DB_NAME}"')
-    
-    cursor.close()
-    conn.close()
+AGENT_DATA = AgentCreate(
+    session_id=0,
+    numerical_characteristics={
+        "age": 30,
+        "income_level": 75000,
+        "political_affiliation": {"economic": 0.2, "governance": -0.1, "cultural": 0.4}
+    },
+    categorical_characteristics={
+        "gender": "male",
+        "employment_style": "white-collar"
+    }
+)
+
+QUESTION_DATA = QuestionCreate(
+    survey_id=0,
+    text="What is your favorite color?",
+    response_type="multiple-choice",
+    options=["Red", "Blue", "Green"]
+)
 
-def drop_test_database():
-    """Drop test database."""
-    # Connect to PostgreSQL server
-    conn = psycopg2.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        database="postgres"
+# Three agents with different ages, incomes, economic leanings, genders, religions and
+# employment styles, for the filter tests
+FILTER_AGENTS_DATA = (
+    AgentCreate(
+        session_id=0,
+        numerical_characteristics={
+            "age": 25, "income_level": 50000,
+            "political_affiliation": {"economic": -0.5, "governance": 0.0, "cultural": 0.3}
+        },
+        categorical_characteristics={"gender": "male", "religion": "christian", "employment_style": "white-collar"}
+    ),
+    AgentCreate(
+        session_id=0,
+        numerical_characteristics={
+            "age": 35, "income_level": 75000,
+            "political_affiliation": {"economic": 0.1, "governance": 0.5, "cultural": -0.2}
+        },
+        categorical_characteristics={"gender": "female", "religion": "christian", "employment_style": "entrepreneur"}
+    ),
+    AgentCreate(
+        session_id=0,
+        numerical_characteristics={
+            "age": 45, "income_level": 100000,
+            "political_affiliation": {"economic": 0.6, "governance": -0.4, "cultural": 0.0}
+        },
+        categorical_characteristics={"gender": "male", "religion": "jewish", "employment_style": "executive/upper management"}
     )
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    cursor = conn.cursor()
-    
-    # Terminate all connections to the test database
-    cursor.execute(f"""
-        SELECT pg_terminate_backend(pg_stat_activity.pid)
-        FROM pg_stat_activity
-        WHERE pg_stat_activity.datname = '{DB_NAME}'
-        AND pid <> pg_backend_pid()
-    """)
-    
-    # Drop database
-    cursor.execute(f'DROP DATABASE IF EXISTS "{DB_NAME}"')
-    
-    cursor.close()
-    conn.close()
+)
 
-@pytest.fixture(scope="session", autouse=True)
-def setup_test_database():
-    """Create test database before tests and drop it after."""
-    create_test_database()
-    yield
-    drop_test_database()
+@pytest.fixture
+def survey(db_session):
+    """Create a test survey."""
+    return crud.create_survey(db_session, SURVEY_DATA)
 
 @pytest.fixture
-def db_session():
-    """Create a fresh database session for each test."""
-    engine = create_engine(DATABASE_URL)
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create the tables
-    Base.metadata.drop_all(bind=engine)  # Drop all tables first
-    Base.metadata.create_all(bind=engine)
-    
-    # Create a session
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        # Drop all tables after the test is done
-        Base.metadata.drop_all(bind=engine)
+def demographic(db_session):
+    """Create a test demographic."""
+    return crud.create_demographic(db_session, DEMOGRAPHIC_DATA)
 
-def test_create_and_get_demographic(db_session):
-    """Test creating and retrieving a demographic."""
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
+@pytest.fixture
+def session_obj(db_session, survey, demographic):
+    """Create a test session for the survey and demographic."""
+    return crud.create_session(db_session, SessionCreate(
+        survey_id=survey.id,
+        demographic_id=demographic.id
+    ))
 
-    # Create a demographic
-    demographic = crud.create_demographic(db_session, demographic_data)
-    assert demographic.id is not None
-    assert demographic.name == "Test Demographic"
-    
-    # Get the demographic
-    retrieved_demographic = crud.get_demographic_by_id(db_session, demographic.id)
-    assert retrieved_demographic is not None
-    assert retrieved_demographic.id == demographic.id
-    assert retrieved_demographic.name == "Test Demographic"
-    assert retrieved_demographic.numerical_characteristics["age_min"] == 18
-    assert retrieved_demographic.numerical_characteristics["age_max"] == 65
+@pytest.fixture
+def agent(db_session, session_obj):
+    """Create a test agent in the session."""
+    return crud.create_agent(db_session, AGENT_DATA.copy(update={"session_id": session_obj.id}))
 
-def test_create_and_get_survey(db_session):
-    """Test creating and retrieving a survey."""
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
+@pytest.fixture
+def question(db_session, survey):
+    """Create a test question in the survey."""
+    return crud.create_question(db_session, QUESTION_DATA.copy(update={"survey_id": survey.id}))
 
-    # Create a survey
-    survey = crud.create_survey(db_session, survey_data)
-    assert survey.id is not None
-    assert survey.name == "Test Survey"
-    
-    # Get the survey
-    retrieved_survey = crud.get_survey_by_id(db_session, survey.id)
-    assert retrieved_survey is not None
-    assert retrieved_survey.id == survey.id
-    assert retrieved_survey.name == "Test Survey"
-    assert retrieved_survey.description == "A test survey"
+# (entity fixture, getter, expected attributes) for the create-and-get round trips
+CREATE_AND_GET_CASES = [
+    ("demographic", crud.get_demographic_by_id, {
+        "name": "Test Demographic",
+        "numerical_characteristics": {"age_min": 18, "age_max": 65},
+        "categorical_characteristics": {"occupation": ["white-collar", "blue-collar"]}
+    }),
+    ("survey", crud.get_survey_by_id, {
+        "name": "Test Survey",
+        "description": "A test survey"
+    }),
+    ("question", crud.get_question_by_id, {
+        "text": "What is your favorite color?",
+        "response_type": "multiple-choice",
+        "options": ["Red", "Blue", "Green"]
+    }),
+    ("session_obj", crud.get_session_by_id, {}),
+    ("agent", crud.get_agent_by_id, {
+        "numerical_characteristics": AGENT_DATA.numerical_characteristics,
+        "categorical_characteristics": AGENT_DATA.categorical_characteristics
+    })
+]
 
-def test_create_and_get_question(db_session):
-    """Test creating and retrieving a question."""
-    # First, create a survey
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    # Create a question
-    question_data = QuestionCreate(
-        survey_id=survey.id,
-        text="What is your favorite color?",
-        response_type="multiple-choice",
-        options=["Red", "Blue", "Green"]
-    )
-    question = crud.create_question(db_session, question_data)
-    assert question.id is not None
-    assert question.text == "What is your favorite color?"
-    
+@pytest.mark.parametrize("entity, getter, expected", CREATE_AND_GET_CASES, ids=[case[0] for case in CREATE_AND_GET_CASES])
+def test_create_and_get(request, db_session, entity, getter, expected):
+    """Test creating an entity and retrieving it by ID."""
+    created = request.getfixturevalue(entity)
+    assert created.id is not None
+    
+    retrieved = getter(db_session, created.id)
+    assert retrieved is not None
+    assert retrieved.id == created.id
+    for attr, value in expected.items():
+        assert getattr(retrieved, attr) == value
+
+def test_created_entities_reference_each_other(db_session, survey, demographic, session_obj, agent, question):
+    """Test that created entities are linked to their parents."""
     # Get questions by survey
     questions = crud.get_questions_by_survey(db_session, survey.id)
-    assert len(questions) == 1
-    assert questions[0].id == question.id
-    assert questions[0].text == "What is your favorite color?"
-    
-    # Get question by ID
-    retrieved_question = crud.get_question_by_id(db_session, question.id)
-    assert retrieved_question is not None
-    assert retrieved_question.id == question.id
-    assert retrieved_question.text == "What is your favorite color?"
-    assert retrieved_question.response_type == "multiple-choice"
-    assert "Red" in retrieved_question.options
-
-def test_create_and_get_session(db_session):
-    """Test creating and retrieving a session."""
-    # First, create a survey and demographic
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
-    
-    # Create a session
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    assert session.id is not None
+    assert [q.id for q in questions] == [question.id]
     
-    # Get the session
-    retrieved_session = crud.get_session_by_id(db_session, session.id)
-    assert retrieved_session is not None
-    assert retrieved_session.id == session.id
+    # The session belongs to the survey and demographic
+    retrieved_session = crud.get_session_by_id(db_session, session_obj.id)
     assert retrieved_session.survey_id == survey.id
     assert retrieved_session.demographic_id == demographic.id
-
-def test_create_and_get_agent(db_session):
-    """Test creating and retrieving an agent."""
-    # First, create a survey, demographic, and session
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
     
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    
-    # Create an agent
-    agent_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 30,
-            "income": 75000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Software Engineer"
-        }
-    )
-    agent = crud.create_agent(db_session, agent_data)
-    assert agent.id is not None
-    
-    # Get the agent
-    retrieved_agent = crud.get_agent_by_id(db_session, agent.id)
-    assert retrieved_agent is not None
-    assert retrieved_agent.id == agent.id
-    assert retrieved_agent.session_id == session.id
-    assert retrieved_agent.numerical_characteristics["age"] == 30
-    assert retrieved_agent.categorical_characteristics["gender"] == "male"
+    # The agent belongs to the session
+    assert crud.get_agent_by_id(db_session, agent.id).session_id == session_obj.id
 
-def test_create_and_get_response(db_session):
+def test_create_and_get_response(db_session, survey, session_obj, agent, question):
     """Test creating and retrieving a response."""
-    # First, create a survey, demographic, session, agent, and question
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
-    
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    
-    agent_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 30,
-            "income": 75000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Software Engineer"
-        }
-    )
-    agent = crud.create_agent(db_session, agent_data)
-    
-    question_data = QuestionCreate(
-        survey_id=survey.id,
-        text="What is your favorite color?",
-        response_type="multiple-choice",
-        options=["Red", "Blue", "Green"]
-    )
-    question = crud.create_question(db_session, question_data)
-    
     # Create a response
     response_data = ResponseCreate(
-        session_id=session.id,
+        session_id=session_obj.id,
         agent_id=agent.id,
         survey_id=survey.id,
         question_id=question.id,
@@ -320,73 +177,38 @@ def test_create_and_get_response(db_session):
     assert responses[0].response == "Blue"
     
     # Get responses by session
-    responses = crud.get_responses_by_session(db_session, session.id)
+    responses = crud.get_responses_by_session(db_session, session_obj.id)
     assert len(responses) == 1
     assert responses[0].id == response.id
     assert responses[0].response == "Blue"
 
-@pytest.mark.skip(reason="PostgreSQL-specific functions not compatible with test setup")
-def test_filter_agents_by_numerical(db_session):
+    # Stream responses instead of materializing them
+    assert [r.id for r in crud.iter_responses_by_survey(db_session, survey.id)] == [response.id]
+    assert [r.id for r in crud.iter_responses_by_agent(db_session, agent.id)] == [response.id]
+    assert [r.id for r in crud.iter_responses_by_session(db_session, session_obj.id)] == [response.id]
+    
+    # Filter responses by text
+    responses = crud.filter_responses_by_text(db_session, "%blu%")
+    assert [r.id for r in responses] == [response.id]
+    assert crud.filter_responses_by_text(db_session, "%red%") == []
+
+def test_iter_agents(db_session, session_obj):
+    """Test streaming agents in batches."""
+    # Create three agents with a single commit
+    agents_data = [data.copy(update={"session_id": session_obj.id}) for data in FILTER_AGENTS_DATA]
+    agent_ids = [agent.id for agent in crud.bulk_create_agents(db_session, agents_data)]
+    
+    # Batches smaller than, equal to and larger than the row count all stream every agent in ID order
+    for chunk in (1, 2, 3, 4):
+        assert [agent.id for agent in crud.iter_agents(db_session, chunk=chunk)] == agent_ids
+
+def test_filter_agents_by_numerical(db_session, session_obj):
     """Test filtering agents by numerical characteristics."""
-    # First, create a survey, demographic, and session
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
-    
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    
     # Create agents with different ages
-    agent1_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 25,
-            "income": 50000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Software Engineer"
-        }
-    )
-    agent1 = crud.create_agent(db_session, agent1_data)
+    agents_data = [data.copy(update={"session_id": session_obj.id}) for data in FILTER_AGENTS_DATA]
     
-    agent2_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 35,
-            "income": 75000
-        },
-        categorical_characteristics={
-            "gender": "female",
-            "occupation": "Data Scientist"
-        }
-    )
-    agent2 = crud.create_agent(db_session, agent2_data)
-    
-    agent3_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 45,
-            "income": 100000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Manager"
-        }
-    )
-    agent3 = crud.create_agent(db_session, agent3_data)
+    # Insert all three with a single commit
+    agent1, agent2, agent3 = crud.bulk_create_agents(db_session, agents_data)
     
     # Filter agents by age > 30
     agents = crud.filter_agents_by_numerical(db_session, "age", ">", 30)
@@ -394,73 +216,29 @@ def test_filter_agents_by_numerical(db_session):
     assert any(agent.id == agent2.id for agent in agents)
     assert any(agent.id == agent3.id for agent in agents)
     
-    # Filter agents by income <= 75000
-    agents = crud.filter_agents_by_numerical(db_session, "income", "<=", 75000)
+    # Filter agents by income_level <= 75000
+    agents = crud.filter_agents_by_numerical(db_session, "income_level", "<=", 75000)
     assert len(agents) == 2
     assert any(agent.id == agent1.id for agent in agents)
     assert any(agent.id == agent2.id for agent in agents)
-
-def test_filter_agents_by_categorical(db_session):
-    """Test filtering agents by categorical characteristics."""
-    # First, create a survey, demographic, and session
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
     
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
-    
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    
-    # Create agents with different genders and occupations
-    agent1_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 25,
-            "income": 50000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Software Engineer"
-        }
-    )
-    agent1 = crud.create_agent(db_session, agent1_data)
+    # Filter agents by the nested economic axis >= 0
+    agents = crud.filter_agents_by_numerical(db_session, "political_economic", ">=", 0)
+    assert len(agents) == 2
+    assert any(agent.id == agent2.id for agent in agents)
+    assert any(agent.id == agent3.id for agent in agents)
     
-    agent2_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 35,
-            "income": 75000
-        },
-        categorical_characteristics={
-            "gender": "female",
-            "occupation": "Data Scientist"
-        }
-    )
-    agent2 = crud.create_agent(db_session, agent2_data)
+    # Unknown characteristics are rejected rather than interpolated into the query
+    with pytest.raises(ValueError):
+        crud.filter_agents_by_numerical(db_session, "shoe_size", ">", 9)
+
+def test_filter_agents_by_categorical(db_session, session_obj):
+    """Test filtering agents by categorical characteristics."""
+    # Create agents with different genders and employment styles
+    agents_data = [data.copy(update={"session_id": session_obj.id}) for data in FILTER_AGENTS_DATA]
     
-    agent3_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 45,
-            "income": 100000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Manager"
-        }
-    )
-    agent3 = crud.create_agent(db_session, agent3_data)
+    # Insert all three with a single commit
+    agent1, agent2, agent3 = crud.bulk_create_agents(db_session, agents_data)
     
     # Filter agents by gender = male
     agents = crud.filter_agents_by_categorical(db_session, "gender", "male")
@@ -468,51 +246,70 @@ def test_filter_agents_by_categorical(db_session):
     assert any(agent.id == agent1.id for agent in agents)
     assert any(agent.id == agent3.id for agent in agents)
     
-    # Filter agents by occupation = Data Scientist
-    agents = crud.filter_agents_by_categorical(db_session, "occupation", "Data Scientist")
+    # Filter agents by religion = christian, which only lives in the JSONB (matched with @>)
+    agents = crud.filter_agents_by_categorical(db_session, "religion", "christian")
+    assert len(agents) == 2
+    assert any(agent.id == agent1.id for agent in agents)
+    assert any(agent.id == agent2.id for agent in agents)
+    
+    # Filter agents by employment_style = entrepreneur
+    agents = crud.filter_agents_by_categorical(db_session, "employment_style", "entrepreneur")
     assert len(agents) == 1
     assert agents[0].id == agent2.id
+    
+    # Unknown characteristics are rejected rather than interpolated into the query
+    with pytest.raises(ValueError):
+        crud.filter_agents_by_categorical(db_session, "favorite_color", "blue")
+    # Only schema fields are whitelisted
+    with pytest.raises(ValueError):
+        crud.filter_agents_by_categorical(db_session, "occupation", "Manager")
+    with pytest.raises(ValueError):
+        crud.filter_agents_by_numerical(db_session, "income", ">", 0)
 
-def test_update_and_delete_agent(db_session):
+def test_get_agents_page(db_session, session_obj):
+    """Test keyset pagination of agents."""
+    # Create three agents
+    agent_ids = []
+    for age in (25, 35, 45):
+        agent = crud.create_agent(db_session, AgentCreate(
+            session_id=session_obj.id,
+            numerical_characteristics={"age": age},
+            categorical_characteristics={"gender": "female"}
+        ))
+        agent_ids.append(agent.id)
+
+    # First page has two agents and a cursor to the next page
+    agents, cursor = crud.get_agents_page(db_session, page_size=2)
+    assert [agent.id for agent in agents] == agent_ids[:2]
+    assert cursor is not None
+
+    # Last page has the remaining agent and no cursor
+    agents, cursor = crud.get_agents_page(db_session, cursor=cursor, page_size=2)
+    assert [agent.id for agent in agents] == agent_ids[2:]
+    assert cursor is None
+
+    # A zero page size is raised to one row rather than returning an empty page with a cursor
+    agents, cursor = crud.get_agents_page(db_session, page_size=0)
+    assert [agent.id for agent in agents] == agent_ids[:1]
+    agents, cursor = crud.get_agents_page(db_session, cursor=cursor, page_size=2)
+    assert [agent.id for agent in agents] == agent_ids[1:]
+
+    # Malformed cursors are rejected
+    with pytest.raises(ValueError):
+        crud.get_agents_page(db_session, cursor="not-a-cursor")
+
+def test_update_and_delete_agent(db_session, agent):
     """Test updating and deleting an agent."""
-    # First, create a survey, demographic, session, and agent
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
-    
-    demographic_data = DemographicsCreate(
-        name="Test Demographic",
-        numerical_characteristics={"age_min": 18, "age_max": 65},
-        categorical_characteristics={"occupation": ["white-collar", "blue-collar"]}
-    )
-    demographic = crud.create_demographic(db_session, demographic_data)
-    
-    session_data = SessionCreate(
-        survey_id=survey.id,
-        demographic_id=demographic.id
-    )
-    session = crud.create_session(db_session, session_data)
-    
-    agent_data = AgentCreate(
-        session_id=session.id,
-        numerical_characteristics={
-            "age": 30,
-            "income": 75000
-        },
-        categorical_characteristics={
-            "gender": "male",
-            "occupation": "Software Engineer"
-        }
-    )
-    agent = crud.create_agent(db_session, agent_data)
+    # An empty update is a no-op that returns the agent unchanged
+    unchanged_agent = crud.update_agent(db_session, agent.id, {})
+    assert unchanged_agent.id == agent.id
+    assert unchanged_agent.numerical_characteristics == AGENT_DATA.numerical_characteristics
     
     # Update the agent
     updated_numerical = agent.numerical_characteristics.copy()
     updated_numerical["age"] = 31
     updated_categorical = agent.categorical_characteristics.copy()
-    updated_categorical["occupation"] = "Senior Software Engineer"
+    updated_categorical["employment_style"] = "executive/upper management"
     
     updated_agent = crud.update_agent(db_session, agent.id, {
         "numerical_characteristics": updated_numerical,
@@ -521,7 +318,7 @@ def test_update_and_delete_agent(db_session):
     
     assert updated_agent is not None
     assert updated_agent.numerical_characteristics["age"] == 31
-    assert updated_agent.categorical_characteristics["occupation"] == "Senior Software Engineer"
+    assert updated_agent.categorical_characteristics["employment_style"] == "executive/upper management"
     
     # Delete the agent
     deleted = crud.delete_agent(db_session, agent.id)
@@ -534,11 +331,7 @@ def test_update_and_delete_agent(db_session):
 def test_update_and_delete_survey(db_session):
     """Test updating and deleting a survey."""
     # Create a survey
-    survey_data = SurveyCreate(
-        name="Test Survey",
-        description="A test survey"
-    )
-    survey = crud.create_survey(db_session, survey_data)
+    survey = crud.create_survey(db_session, SURVEY_DATA)
     
     # Update the survey
     updated_survey = crud.update_survey(db_session, survey.id, {
@@ -556,4 +349,12 @@ def test_update_and_delete_survey(db_session):
     
     # Verify deletion
     retrieved_survey = crud.get_survey_by_id(db_session, survey.id)
-    assert retrieved_survey is None 
\ No newline at end of file
+    assert retrieved_survey is None 
+
+def test_demographics_gin_indexes():
+    """Guard against the JSONB GIN indexes on demographics being dropped from the models."""
+    indexes = {index.name: index for index in models.Demographics.__table__.indexes}
+    for name in ('ix_demographics_numerical_characteristics', 'ix_demographics_categorical_characteristics'):
+        assert name in indexes
+        assert indexes[name].dialect_options['postgresql']['using'] == 'gin'
+    assert 'num_agents' in models.Demographics.__table__.c
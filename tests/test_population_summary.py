@@ -1,9 +1,14 @@
-import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 import pytest
 from backend.core.population_summary import (
     summarize_population,
     summarize_multiple_demographics,
-    format_profile_for_display
+    format_profile_for_display,
+    sample_from_distribution,
+    sample_from_categorical
 )
 from backend.core.schemas import (
     DemographicDistribution,
@@ -11,106 +16,97 @@ from backend.core.schemas import (
     CategoricalCharacteristicsDistribution,
     DistributionData,
     PoliticalAffiliationDistribution,
-    ProbabilityPoint,
-    CategoricalProbabilityWithEnum,
     DemographicsBase
 )
 
-def create_example_demographic():
-    """Create an example demographic distribution for testing"""
-    # Create example probability points for age distribution
-    age_points = [
-        ProbabilityPoint(value=20, probability=0.2),
-        ProbabilityPoint(value=30, probability=0.3),
-        ProbabilityPoint(value=40, probability=0.3),
-        ProbabilityPoint(value=60, probability=0.2)
+# Keys every profile's political leaning must have
+EXPECTED_POLITICAL_KEYS = frozenset({"economic", "governance", "cultural"})
+
+# The helpers return plain dicts, like the demographic2 literal below; the
+# enclosing model validates them in one pass instead of one model per point
+def probability_points(values, probabilities):
+    """Build a distribution's probability points from parallel value and probability sequences"""
+    return [{"value": value, "probability": probability} for value, probability in zip(values, probabilities)]
+
+def category_probabilities(categories, probabilities):
+    """Build a categorical distribution from parallel category and probability sequences"""
+    return [
+        {"category": category, "probability": probability}
+        for category, probability in zip(categories, probabilities)
     ]
+
+def build_example_demographic():
+    """Build the example demographic distribution from scratch"""
+    # Create example probability points for age distribution
+    age_points = probability_points(
+        (20, 30, 40, 60),
+        (0.2, 0.3, 0.3, 0.2)
+    )
     
     # Create example probability points for income distribution
-    income_points = [
-        ProbabilityPoint(value=30000, probability=0.3),
-        ProbabilityPoint(value=60000, probability=0.4),
-        ProbabilityPoint(value=100000, probability=0.2),
-        ProbabilityPoint(value=150000, probability=0.1)
-    ]
+    income_points = probability_points(
+        (30000, 60000, 100000, 150000),
+        (0.3, 0.4, 0.2, 0.1)
+    )
     
     # Create example probability points for education distribution
-    education_points = [
-        ProbabilityPoint(value=12, probability=0.4),
-        ProbabilityPoint(value=16, probability=0.4),
-        ProbabilityPoint(value=20, probability=0.2)
-    ]
+    education_points = probability_points(
+        (12, 16, 20),
+        (0.4, 0.4, 0.2)
+    )
     
     # Create example probability points for religiosity distribution
-    religiosity_points = [
-        ProbabilityPoint(value=2, probability=0.3),
-        ProbabilityPoint(value=5, probability=0.4),
-        ProbabilityPoint(value=8, probability=0.3)
-    ]
+    religiosity_points = probability_points(
+        (2, 5, 8),
+        (0.3, 0.4, 0.3)
+    )
     
     # Create example political distributions
-    economic_points = [
-        ProbabilityPoint(value=-0.5, probability=0.3),
-        ProbabilityPoint(value=0, probability=0.4),
-        ProbabilityPoint(value=0.5, probability=0.3)
-    ]
+    economic_points = probability_points(
+        (-0.5, 0, 0.5),
+        (0.3, 0.4, 0.3)
+    )
     
-    governance_points = [
-        ProbabilityPoint(value=-0.7, probability=0.2),
-        ProbabilityPoint(value=-0.2, probability=0.3),
-        ProbabilityPoint(value=0.3, probability=0.3),
-        ProbabilityPoint(value=0.8, probability=0.2)
-    ]
+    governance_points = probability_points(
+        (-0.7, -0.2, 0.3, 0.8),
+        (0.2, 0.3, 0.3, 0.2)
+    )
     
-    cultural_points = [
-        ProbabilityPoint(value=-0.8, probability=0.25),
-        ProbabilityPoint(value=-0.3, probability=0.25),
-        ProbabilityPoint(value=0.3, probability=0.25),
-        ProbabilityPoint(value=0.8, probability=0.25)
-    ]
+    cultural_points = probability_points(
+        (-0.8, -0.3, 0.3, 0.8),
+        (0.25, 0.25, 0.25, 0.25)
+    )
     
     # Create example categorical distributions
-    race_ethnicity = [
-        CategoricalProbabilityWithEnum(category="white", probability=0.6),
-        CategoricalProbabilityWithEnum(category="black", probability=0.15),
-        CategoricalProbabilityWithEnum(category="hispanic", probability=0.15),
-        CategoricalProbabilityWithEnum(category="east asian", probability=0.1)
-    ]
+    race_ethnicity = category_probabilities(
+        ("white", "black", "hispanic", "east asian"),
+        (0.6, 0.15, 0.15, 0.1)
+    )
     
-    gender = [
-        CategoricalProbabilityWithEnum(category="male", probability=0.48),
-        CategoricalProbabilityWithEnum(category="female", probability=0.48),
-        CategoricalProbabilityWithEnum(category="nonbinary", probability=0.04)
-    ]
+    gender = category_probabilities(
+        ("male", "female", "nonbinary"),
+        (0.48, 0.48, 0.04)
+    )
     
-    religion = [
-        CategoricalProbabilityWithEnum(category="christian", probability=0.65),
-        CategoricalProbabilityWithEnum(category="jewish", probability=0.05),
-        CategoricalProbabilityWithEnum(category="muslim", probability=0.05),
-        CategoricalProbabilityWithEnum(category="hindu", probability=0.05),
-        CategoricalProbabilityWithEnum(category="buddhist", probability=0.05),
-        CategoricalProbabilityWithEnum(category="other", probability=0.15)
-    ]
+    religion = category_probabilities(
+        ("christian", "jewish", "muslim", "hindu", "buddhist", "other"),
+        (0.65, 0.05, 0.05, 0.05, 0.05, 0.15)
+    )
     
-    urbanization = [
-        CategoricalProbabilityWithEnum(category="urban", probability=0.4),
-        CategoricalProbabilityWithEnum(category="suburban", probability=0.4),
-        CategoricalProbabilityWithEnum(category="rural", probability=0.2)
-    ]
+    urbanization = category_probabilities(
+        ("urban", "suburban", "rural"),
+        (0.4, 0.4, 0.2)
+    )
     
-    education_style = [
-        CategoricalProbabilityWithEnum(category="formal k-12", probability=0.3),
-        CategoricalProbabilityWithEnum(category="formal k-12 + university", probability=0.5),
-        CategoricalProbabilityWithEnum(category="vocational", probability=0.2)
-    ]
+    education_style = category_probabilities(
+        ("formal k-12", "formal k-12 + university", "vocational"),
+        (0.3, 0.5, 0.2)
+    )
     
-    employment_style = [
-        CategoricalProbabilityWithEnum(category="white-collar", probability=0.4),
-        CategoricalProbabilityWithEnum(category="blue-collar", probability=0.3),
-        CategoricalProbabilityWithEnum(category="entrepreneur", probability=0.1),
-        CategoricalProbabilityWithEnum(category="unemployed", probability=0.1),
-        CategoricalProbabilityWithEnum(category="retired", probability=0.1)
-    ]
+    employment_style = category_probabilities(
+        ("white-collar", "blue-collar", "entrepreneur", "unemployed", "retired"),
+        (0.4, 0.3, 0.1, 0.1, 0.1)
+    )
     
     # Create the full demographic distribution
     return DemographicDistribution(
@@ -136,12 +132,27 @@ def create_example_demographic():
         )
     )
 
+@lru_cache(maxsize=None)
+def _example_demographic_prototype():
+    """The example demographic distribution, built once and shared"""
+    return build_example_demographic()
+
+def create_example_demographic():
+    """Create an example demographic distribution for testing"""
+    # A shallow copy of the prototype; the tests only read it, so nested
+    # models are shared rather than rebuilt
+    return _example_demographic_prototype().copy()
+
 def create_example_demographics_base():
     """Create example DemographicsBase objects for testing"""
+    # Dump both halves of the example distribution in a single traversal. The
+    # characteristics are plain Dict[str, Any] fields on DemographicsBase, so
+    # validating it is shallow and cheaper than model_construct
+    characteristics = create_example_demographic().dict()
     demographic1 = DemographicsBase(
         name="Urban Professionals",
-        numerical_characteristics=create_example_demographic().numerical.dict(),
-        categorical_characteristics=create_example_demographic().categorical.dict(),
+        numerical_characteristics=characteristics["numerical"],
+        categorical_characteristics=characteristics["categorical"],
         num_agents=1000,
         id=1
     )
@@ -240,10 +251,52 @@ def create_example_demographics_base():
     
     return [demographic1, demographic2]
 
-def test_summarize_population():
+@dataclass(frozen=True)
+class SampledField:
+    """A distribution's values with their probabilities, normalized to sum to 1."""
+    values: np.ndarray
+    probabilities: np.ndarray
+
+def sampled_field(values, probabilities):
+    """Build a SampledField from parallel value and probability sequences"""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    return SampledField(np.asarray(values), probabilities / probabilities.sum())
+
+def sampled_fields(demographic):
+    """Pair every distribution of a demographic with its sampler and SampledField"""
+    numerical = demographic.numerical
+    political = numerical.political_affiliation
+    categorical = demographic.categorical
+    fields = {}
+    for name, distribution in (
+        ("age", numerical.age),
+        ("income_level", numerical.income_level),
+        ("years_of_education", numerical.years_of_education),
+        ("religiosity", numerical.religiosity),
+        ("economic", political.economic),
+        ("governance", political.governance),
+        ("cultural", political.cultural)
+    ):
+        fields[name] = (distribution, sample_from_distribution, sampled_field(
+            [point.value for point in distribution.points],
+            [point.probability for point in distribution.points]
+        ))
+    for name in ("race_ethnicity", "gender", "religion", "urbanization", "education_style", "employment_style"):
+        distribution = getattr(categorical, name)
+        fields[name] = (distribution, sample_from_categorical, sampled_field(
+            [cat_prob.category for cat_prob in distribution],
+            [cat_prob.probability for cat_prob in distribution]
+        ))
+    return fields
+
+@pytest.fixture(scope="session")
+def prebuilt_demographics():
+    """The example demographic distribution and DemographicsBase objects, built once per session"""
+    return create_example_demographic(), create_example_demographics_base()
+
+def test_summarize_population(prebuilt_demographics):
     """Test that population summary works correctly"""
-    # Create an example demographic distribution
-    demographic = create_example_demographic()
+    demographic, _ = prebuilt_demographics
     
     # Generate a summary
     summary = summarize_population(demographic, 1000, 4)
@@ -252,28 +305,50 @@ def test_summarize_population():
     assert summary.total_agents == 1000
     assert len(summary.profiles) == 4
     
+    # Check the numeric fields of all profiles at once, one array per field
+    profiles = summary.profiles
+    num_profiles = len(profiles)
+    counts = np.fromiter((p.count for p in profiles), dtype=np.int64, count=num_profiles)
+    percentages = np.fromiter((p.percentage for p in profiles), dtype=np.float64, count=num_profiles)
+    age_ranges = np.array([p.age_range for p in profiles], dtype=np.float64)
+    income_ranges = np.array([p.income_range for p in profiles], dtype=np.float64)
+    education_years = np.fromiter((p.education_years for p in profiles), dtype=np.float64, count=num_profiles)
+    
+    assert (counts > 0).all()
+    assert ((0 < percentages) & (percentages <= 100)).all()
+    assert (age_ranges[:, 0] <= age_ranges[:, 1]).all()
+    assert (income_ranges[:, 0] <= income_ranges[:, 1]).all()
+    assert (education_years > 0).all()
+    
     # Check that the profiles have the expected structure
-    for profile in summary.profiles:
-        assert profile.name is not None
-        assert profile.count > 0
-        assert 0 < profile.percentage <= 100
-        assert profile.age_range[0] <= profile.age_range[1]
-        assert profile.income_range[0] <= profile.income_range[1]
-        assert profile.education_years > 0
-        assert "economic" in profile.political_leaning
-        assert "governance" in profile.political_leaning
-        assert "cultural" in profile.political_leaning
-        assert len(profile.employment) > 0
-        assert len(profile.religion) > 0
-        assert len(profile.race_ethnicity) > 0
-        assert len(profile.gender) > 0
-        assert len(profile.urbanization) > 0
-        assert len(profile.education_style) > 0
+    assert all(
+        profile.name is not None
+        and EXPECTED_POLITICAL_KEYS <= profile.political_leaning.keys()
+        and profile.employment
+        and profile.religion
+        and profile.race_ethnicity
+        and profile.gender
+        and profile.urbanization
+        and profile.education_style
+        for profile in profiles
+    )
+
+def test_samples_follow_distributions(prebuilt_demographics):
+    """Test that the deterministic samplers reproduce each distribution's probabilities"""
+    demographic, _ = prebuilt_demographics
+    num_samples = 1000
+    
+    for name, (distribution, sampler, field) in sampled_fields(demographic).items():
+        samples = np.asarray(sampler(distribution, num_samples))
+        assert len(samples) == num_samples, name
+        
+        # Each value is sampled in proportion to its probability, up to rounding
+        frequencies = (samples[:, None] == field.values).sum(axis=0) / num_samples
+        assert np.allclose(frequencies, field.probabilities, atol=len(field.values) / num_samples), name
 
-def test_summarize_multiple_demographics():
+def test_summarize_multiple_demographics(prebuilt_demographics):
     """Test that multiple demographics summary works correctly"""
-    # Create example demographics
-    demographics = create_example_demographics_base()
+    _, demographics = prebuilt_demographics
     
     # Generate a summary
     summary = summarize_multiple_demographics(demographics, 3)
@@ -289,8 +364,8 @@ def test_summarize_multiple_demographics():
         assert bucket.total_agents in [1000, 500]
         assert len(bucket.profiles) == 3
 
-if __name__ == "__main__":
-    # Run the demo
+def run_demo():
+    """Print representative buckets for the example demographics"""
     demographic = create_example_demographic()
     
     # Generate a summary for 1000 agents with 4 representative buckets
@@ -316,4 +391,9 @@ if __name__ == "__main__":
     for demo_name, bucket in multi_summary.demographic_buckets.items():
         print(f"\n--- {demo_name} ---\n")
         for profile in bucket.profiles:
-            print(format_profile_for_display(profile)) 
\ No newline at end of file
+            print(format_profile_for_display(profile))
+
+# Executing this file only runs the demo when asked, so smoke steps that run
+# it directly don't repeat the summaries the tests already compute
+if __name__ == "__main__" and os.environ.get("RUN_DEMO") == "1":
+    run_demo()